@@ -0,0 +1,256 @@
+# chat_cache.py
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# ============================================================
+# Cache keys
+# ============================================================
+
+def _round_floats(value: Any, ndigits: int) -> Any:
+    if isinstance(value, float):
+        return round(value, ndigits)
+    if isinstance(value, dict):
+        return {k: _round_floats(v, ndigits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(v, ndigits) for v in value]
+    return value
+
+
+def normalize_message(message: str) -> str:
+    """
+    Case- and whitespace-insensitive form of a user question.
+    """
+    return re.sub(r"\s+", " ", message).strip().lower()
+
+
+def chat_cache_key(
+    system_prompt: str,
+    project_data: Dict[str, Any],
+    risk_assessment: Dict[str, Any],
+    user_message: str,
+    risk_ndigits: int = 3,
+) -> str:
+    """
+    Content hash of everything that shapes a chatbot answer.
+
+    Project data is serialized canonically (sorted keys, compact), the risk
+    assessment is rounded to the precision the prompt actually shows, and
+    the message is normalized, so trivially different requests share a key.
+    `all_samples` is dropped from the risk assessment since the prompt never
+    uses it.
+    """
+    risk = {k: v for k, v in (risk_assessment or {}).items() if k != "all_samples"}
+    payload = {
+        "system": hashlib.sha256(system_prompt.encode()).hexdigest(),
+        "project": project_data or {},
+        "risk": _round_floats(risk, risk_ndigits),
+        "message": normalize_message(user_message),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# ============================================================
+# TTL LRU with single-flight
+# ============================================================
+
+class _Flight:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self, timeout: Optional[float]) -> str:
+        if not self.event.wait(timeout):
+            raise TimeoutError("Timed out waiting for an identical in-flight chat request")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0     # requests that waited on an identical in-flight call
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ChatResponseCache:
+    """
+    Bounded in-memory LRU of chatbot answers with a per-entry TTL.
+
+    Concurrent identical questions are de-duplicated: the first caller
+    (the leader) makes the upstream call and the others wait for its result.
+    Failures are never cached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _get_locked(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.stats.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def join(self, key: str) -> Tuple[str, Any]:
+        """
+        Look up `key` and register interest in it. Returns one of
+          ("hit", value)      - cached answer
+          ("wait", flight)    - identical request in flight; call flight.wait()
+          ("lead", None)      - caller must compute and then call finish()
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.stats.hits += 1
+                return "hit", value
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.stats.coalesced += 1
+                return "wait", flight
+            self.stats.misses += 1
+            self._inflight[key] = _Flight()
+            return "lead", None
+
+    def finish(self, key: str, value: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        """
+        Settle a flight started by join() == "lead"; caches `value` on success.
+        """
+        if error is None and value is not None:
+            self.put(key, value)
+        with self._lock:
+            flight = self._inflight.pop(key, None)
+        if flight is not None:
+            flight.value = value
+            flight.error = error
+            if error is None and value is None:
+                flight.error = RuntimeError("No answer produced")
+            flight.event.set()
+
+    def get_or_compute(
+        self, key: str, compute: Callable[[], str], wait_timeout: Optional[float] = None
+    ) -> Tuple[str, str]:
+        """
+        Return (answer, source) where source is "hit", "coalesced" or "miss".
+        """
+        status, found = self.join(key)
+        if status == "hit":
+            return found, "hit"
+        if status == "wait":
+            return found.wait(wait_timeout), "coalesced"
+        try:
+            value = compute()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, value)
+        return value, "miss"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+            inflight = len(self._inflight)
+        lookups = self.stats.hits + self.stats.misses + self.stats.coalesced
+        return {
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "inflight": inflight,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "coalesced": self.stats.coalesced,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "hit_rate": (self.stats.hits + self.stats.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+def chat_cache_from_env() -> ChatResponseCache:
+    return ChatResponseCache(
+        max_entries=int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "1024")),
+        ttl_s=float(os.getenv("CHAT_CACHE_TTL_S", "3600")),
+    )
+
+
+class RecordingStream:
+    """
+    Wraps a streaming answer for the single-flight leader: passes deltas
+    through, and on completion caches the full text; if the stream fails or
+    is closed early, waiting followers get an error instead of hanging.
+    """
+
+    def __init__(self, stream: Any, cache: ChatResponseCache, key: str) -> None:
+        self._stream = stream
+        self._cache = cache
+        self._key = key
+        self._parts: List[str] = []
+        self._settled = False
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for delta in self._stream:
+                self._parts.append(delta)
+                yield delta
+            self._settle(value="".join(self._parts))
+        except BaseException as e:
+            self._settle(error=e)
+            raise
+        finally:
+            self.close()
+
+    def _settle(self, value: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+        if not self._settled:
+            self._settled = True
+            self._cache.finish(self._key, value=value, error=error)
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._settle(error=RuntimeError("Chat stream closed before completion"))
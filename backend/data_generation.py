@@ -0,0 +1,400 @@
+# data_generation.py
+
+"""
+Synthetic JIRA project data for training and load testing the risk engine.
+
+Small datasets (the 50k-row training CSV) can be built in memory with
+generate_synthetic_projects(). Large ones are produced as independent,
+seeded chunks in a process pool and streamed straight into sharded
+Parquet/CSV files:
+
+    python data_generation.py --rows 200000000 --shards 64 --out data/synth
+
+Output is deterministic for a given (seed, rows, shards, chunk_size),
+regardless of the number of worker processes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from feature_derivation import DERIVED_FEATURE_NAMES, derive_features
+
+
+INT_COLS: List[str] = [
+    "total_project_members",
+    "total_project_stories",
+    "total_story_points",
+    "number_of_low_priority_stories",
+    "number_of_medium_priority_stories",
+    "number_of_high_priority_stories",
+    "number_of_stories_in_progress",
+    "number_of_stories_completed",
+    "number_of_stories_todo",
+    "number_of_stories_in_review",
+    "number_of_different_teams",
+    "number_of_testing_stories",
+    "number_of_epics",
+    "is_delayed",
+]
+
+# Columns whose batch mean/std feed the latent delay logit. For chunked
+# generation they are fixed up front so every chunk labels rows the same way.
+LABEL_STAT_COLS: List[str] = [
+    "total_story_points",
+    "testing_ratio",
+    "total_project_members",
+    "avg_seniority_days",
+    "avg_completion_hours",
+    "avg_inprogress_hours",
+]
+
+LabelStats = Dict[str, Tuple[float, float]]
+
+
+# ============================================================
+# Row generation
+# ============================================================
+
+def generate_synthetic_projects(
+    n: int,
+    rng: np.random.Generator,
+    label_stats: Optional[LabelStats] = None,
+) -> pd.DataFrame:
+    """
+    Generate synthetic project-level data for the risk engine.
+
+    Each row represents a project (or release) snapshot with aggregate metrics
+    and a binary label `is_delayed` that depends on workload, staffing,
+    seniority, and time metrics.
+
+    If `label_stats` is None the label logit is normalized with this batch's
+    own mean/std (the original notebook behaviour); pass fixed stats from
+    compute_label_stats() to make chunks independent of each other.
+    """
+    raw = _draw_raw_columns(n, rng)
+    return _label_and_build(raw, label_stats or _batch_label_stats(raw))
+
+
+def _draw_raw_columns(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    # ---- Basic sizes ----
+    total_project_members = rng.integers(low=3, high=25, size=n)  # team size
+    number_of_different_teams = rng.integers(low=1, high=5, size=n)
+
+    # ---- Stories and story points ----
+    total_project_stories = rng.integers(low=20, high=300, size=n)
+
+    # average ~5 story points per story, with some noise
+    base_points_per_story = rng.normal(loc=5.0, scale=1.5, size=n)
+    base_points_per_story = np.clip(base_points_per_story, 1.0, 13.0)
+
+    total_story_points = (total_project_stories * base_points_per_story).round().astype(int)
+
+    # ---- Priority breakdown (Low / Medium / High) ----
+    priority_dirichlet = rng.dirichlet(alpha=[2.0, 3.0, 1.5], size=n)
+    num_low = np.round(priority_dirichlet[:, 0] * total_project_stories).astype(int)
+    num_med = np.round(priority_dirichlet[:, 1] * total_project_stories).astype(int)
+    num_high = np.maximum(total_project_stories - num_low - num_med, 0)
+
+    # ---- Status breakdown (todo / in progress / completed / in review) ----
+    status_dirichlet = rng.dirichlet(alpha=[1.5, 2.0, 3.0, 1.0], size=n)
+    num_todo = np.round(status_dirichlet[:, 0] * total_project_stories).astype(int)
+    num_inprogress = np.round(status_dirichlet[:, 1] * total_project_stories).astype(int)
+    num_completed = np.round(status_dirichlet[:, 2] * total_project_stories).astype(int)
+    num_review = np.maximum(total_project_stories - num_todo - num_inprogress - num_completed, 0)
+
+    # ---- Testing stories ----
+    # Assume 10–40% of stories involve testing
+    testing_ratio = rng.uniform(0.1, 0.4, size=n)
+    num_testing = np.round(testing_ratio * total_project_stories).astype(int)
+
+    # ---- Epics ----
+    number_of_epics = rng.integers(low=2, high=15, size=n)
+    number_of_epics = np.minimum(number_of_epics, total_project_stories)  # cannot exceed stories
+
+    # ---- Seniority ----
+    # Average seniority in days (e.g., 1 to 10 years)
+    avg_seniority_days = rng.normal(loc=365 * 3.0, scale=365.0, size=n)
+    avg_seniority_days = np.clip(avg_seniority_days, 365.0, 365.0 * 10)
+
+    # ---- Time metrics ----
+    # Completion time: 24–120 hours typical
+    avg_completion_hours = rng.normal(loc=72.0, scale=20.0, size=n)
+    avg_completion_hours = np.clip(avg_completion_hours, 8.0, 200.0)
+
+    # In-progress time: somewhat lower, but correlated
+    avg_inprogress_hours = avg_completion_hours * rng.uniform(0.3, 0.8, size=n)
+
+    # ---- Estimated project duration (in days) ----
+    # Roughly story_points / (team_capacity_per_day)
+    capacity_per_person_per_day = rng.uniform(0.5, 1.5, size=n)
+    estimated_duration_days = total_story_points / (
+        np.maximum(total_project_members * capacity_per_person_per_day, 1.0)
+    )
+    # add some noise
+    estimated_duration_days += rng.normal(loc=0.0, scale=5.0, size=n)
+    estimated_duration_days = np.clip(estimated_duration_days, 7.0, 365.0)
+
+    # ---- Extra latent factors (not observed by the model) ----
+    # Drawn to keep the RNG stream identical to the original notebook.
+    rng.normal(loc=0.0, scale=1.0, size=n)   # organizational volatility
+    rng.uniform(0.0, 1.0, size=n)            # requirements clarity
+
+    raw = {
+        "total_project_members": total_project_members,
+        "total_project_stories": total_project_stories,
+        "total_story_points": total_story_points,
+        "number_of_low_priority_stories": num_low,
+        "number_of_medium_priority_stories": num_med,
+        "number_of_high_priority_stories": num_high,
+        "number_of_stories_in_progress": num_inprogress,
+        "number_of_stories_completed": num_completed,
+        "number_of_stories_todo": num_todo,
+        "number_of_stories_in_review": num_review,
+        "number_of_different_teams": number_of_different_teams,
+        "number_of_testing_stories": num_testing,
+        "estimated_project_duration_in_days": estimated_duration_days,
+        "number_of_epics": number_of_epics,
+        # drawn directly in days, so derive_features keeps it as supplied
+        "average_seniority_level_per_engineer_in_days": avg_seniority_days,
+        "average_time_of_story_completion_in_hours": avg_completion_hours,
+        "average_time_of_stories_in_progress_in_hours": avg_inprogress_hours,
+    }
+
+    # Ratio features come from the same DERIVED_FEATURES spec used at
+    # serving time, so training data and prepare_feature_row agree.
+    features = derive_features(raw)
+    columns = {
+        name: features[name].to_numpy() if name in DERIVED_FEATURE_NAMES else raw[name]
+        for name in features.columns
+    }
+    # latent input to the label only, not emitted as a column
+    columns["testing_ratio"] = testing_ratio
+    return columns
+
+
+def _label_inputs(raw: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return {
+        "total_story_points": raw["total_story_points"],
+        "testing_ratio": raw["testing_ratio"],
+        "total_project_members": raw["total_project_members"],
+        "avg_seniority_days": raw["average_seniority_level_per_engineer_in_days"],
+        "avg_completion_hours": raw["average_time_of_story_completion_in_hours"],
+        "avg_inprogress_hours": raw["average_time_of_stories_in_progress_in_hours"],
+    }
+
+
+def _batch_label_stats(raw: Dict[str, np.ndarray]) -> LabelStats:
+    inputs = _label_inputs(raw)
+    return {col: (float(inputs[col].mean()), float(inputs[col].std())) for col in LABEL_STAT_COLS}
+
+
+def _label_and_build(raw: Dict[str, np.ndarray], stats: LabelStats) -> pd.DataFrame:
+    # ---- Label: is_delayed (binary) ----
+    # Intuition:
+    #   - more story points -> more risk of delay
+    #   - more testing stories -> more risk
+    #   - larger team & higher seniority -> lower risk
+    #   - longer completion/in-progress times -> more risk
+    inputs = _label_inputs(raw)
+    norm = {col: (inputs[col] - stats[col][0]) / stats[col][1] for col in LABEL_STAT_COLS}
+
+    # Coefficients roughly tuned to give ~25–40% delayed projects
+    logit_p = (
+        -0.3
+        + 0.4 * norm["total_story_points"]
+        + 0.3 * norm["testing_ratio"]
+        - 0.25 * norm["total_project_members"]
+        - 0.2 * norm["avg_seniority_days"]
+        + 0.35 * norm["avg_completion_hours"]
+        + 0.2 * norm["avg_inprogress_hours"]
+    )
+    prob_delayed = 1 / (1 + np.exp(-logit_p))
+
+    # Deterministic label: delayed if p >= 0.5
+    is_delayed = (prob_delayed >= 0.5).astype(int)
+
+    # ---- Build DataFrame ----
+    df = pd.DataFrame({k: v for k, v in raw.items() if k != "testing_ratio"})
+    df["is_delayed"] = is_delayed
+
+    # Ensure count-like columns are integer dtype
+    df[INT_COLS] = df[INT_COLS].astype(np.int64)
+    return df
+
+
+def compute_label_stats(seed_seq: np.random.SeedSequence, n: int = 200_000) -> LabelStats:
+    """
+    Estimate the label-normalization mean/std from a seeded calibration sample.
+    """
+    return _batch_label_stats(_draw_raw_columns(n, np.random.default_rng(seed_seq)))
+
+
+# ============================================================
+# Sharded, parallel generation
+# ============================================================
+
+@dataclass
+class GenerationConfig:
+    n_rows: int
+    n_shards: int = 16
+    seed: int = 42
+    chunk_size: int = 250_000          # rows held in memory per worker at once
+    output_dir: str = "synthetic_data"
+    fmt: str = "parquet"               # "parquet" or "csv"
+    n_workers: Optional[int] = None    # defaults to os.cpu_count()
+    n_calibration: int = 200_000
+
+
+def shard_row_counts(n_rows: int, n_shards: int) -> List[int]:
+    """
+    Split n_rows as evenly as possible; the first shards take the remainder.
+    """
+    base, extra = divmod(n_rows, n_shards)
+    return [base + (1 if i < extra else 0) for i in range(n_shards)]
+
+
+def _write_shard(
+    path: str,
+    n_rows: int,
+    seed_seq: np.random.SeedSequence,
+    chunk_size: int,
+    label_stats: LabelStats,
+    fmt: str,
+) -> Tuple[str, int, int]:
+    """
+    Generate one shard chunk-by-chunk, appending each chunk to `path`.
+
+    Every chunk has its own Generator spawned from the shard's SeedSequence,
+    so a chunk's contents only depend on (seed, shard index, chunk index).
+    Runs in a worker process; returns (path, rows, delayed_rows).
+    """
+    n_chunks = max((n_rows + chunk_size - 1) // chunk_size, 1)
+    chunk_seqs = seed_seq.spawn(n_chunks)
+    tmp_path = path + ".tmp"
+    writer = None
+    n_delayed = 0
+
+    try:
+        for i, chunk_seq in enumerate(chunk_seqs):
+            # n is 0 only for an empty shard, which still gets a header/schema
+            n = max(min(chunk_size, n_rows - i * chunk_size), 0)
+            df = generate_synthetic_projects(n, np.random.default_rng(chunk_seq), label_stats)
+            n_delayed += int(df["is_delayed"].sum())
+
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression="zstd")
+                writer.write_table(table)
+            else:
+                df.to_csv(tmp_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_path, path)
+    return path, n_rows, n_delayed
+
+
+def generate_sharded(config: GenerationConfig) -> List[str]:
+    """
+    Write `config.n_rows` synthetic rows into `config.n_shards` files.
+
+    Shards are generated in parallel worker processes; memory per worker is
+    bounded by `chunk_size` rows. Returns the shard paths in order.
+    """
+    if config.fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unsupported format {config.fmt!r}, expected 'parquet' or 'csv'")
+    if config.n_shards < 1 or config.n_rows < 0:
+        raise ValueError("n_shards must be >= 1 and n_rows >= 0")
+    if config.chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    os.makedirs(config.output_dir, exist_ok=True)
+
+    root = np.random.SeedSequence(config.seed)
+    calibration_seq, shards_seq = root.spawn(2)
+    label_stats = compute_label_stats(calibration_seq, config.n_calibration)
+    shard_seqs = shards_seq.spawn(config.n_shards)
+    counts = shard_row_counts(config.n_rows, config.n_shards)
+
+    ext = "parquet" if config.fmt == "parquet" else "csv"
+    paths = [
+        os.path.join(config.output_dir, f"shard-{i:05d}-of-{config.n_shards:05d}.{ext}")
+        for i in range(config.n_shards)
+    ]
+
+    print(
+        f"[data_generation] Generating {config.n_rows:,} rows into {config.n_shards} "
+        f"{config.fmt} shards under {config.output_dir}"
+    )
+    start = time.perf_counter()
+    total_rows = 0
+    total_delayed = 0
+
+    with ProcessPoolExecutor(max_workers=config.n_workers) as pool:
+        futures = [
+            pool.submit(
+                _write_shard, path, n, seq, config.chunk_size, label_stats, config.fmt
+            )
+            for path, n, seq in zip(paths, counts, shard_seqs)
+        ]
+        for future in as_completed(futures):
+            path, n, n_delayed = future.result()
+            total_rows += n
+            total_delayed += n_delayed
+            print(f"[data_generation] wrote {path} ({n:,} rows)")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"[data_generation] Done: {total_rows:,} rows in {elapsed:.1f}s "
+        f"({total_rows / max(elapsed, 1e-9):,.0f} rows/s), "
+        f"delayed fraction {total_delayed / max(total_rows, 1):.3f}"
+    )
+    return paths
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic JIRA project data.")
+    parser.add_argument("--rows", type=int, required=True, help="total number of rows")
+    parser.add_argument("--shards", type=int, default=16, help="number of output files")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=250_000,
+                        help="rows generated per step inside a worker (bounds memory)")
+    parser.add_argument("--out", default="synthetic_data", help="output directory")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    generate_sharded(
+        GenerationConfig(
+            n_rows=args.rows,
+            n_shards=args.shards,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            output_dir=args.out,
+            fmt=args.format,
+            n_workers=args.workers,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# drift.py
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# PSI rule of thumb: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+_EPS = 1e-6
+
+
+# ============================================================
+# Streaming sketch
+# ============================================================
+
+class StreamingSketch:
+    """
+    Constant-memory summary of a stream of fixed-length vectors.
+
+    Per column it keeps running moments (Welford) and a histogram over
+    fixed bin edges. Edges come from reference quantiles, so every bin
+    holds ~1/n_bins of the reference mass and CDF error is bounded by one
+    bin. Updates
+    are a handful of vectorized numpy ops across all columns at once and
+    memory never grows with the number of observations.
+    """
+
+    def __init__(self, names: List[str], edges: np.ndarray) -> None:
+        self.names = list(names)
+        self.edges = np.asarray(edges, dtype=np.float64)      # (n_cols, n_bins - 1) interior edges
+        n_cols, n_edges = self.edges.shape
+        self.counts = np.zeros((n_cols, n_edges + 1), dtype=np.int64)
+        self.n = np.zeros(n_cols, dtype=np.int64)
+        self.n_missing = np.zeros(n_cols, dtype=np.int64)
+        self.mean = np.zeros(n_cols, dtype=np.float64)
+        self.m2 = np.zeros(n_cols, dtype=np.float64)
+        self.min = np.full(n_cols, np.inf)
+        self.max = np.full(n_cols, -np.inf)
+        self._cols = np.arange(n_cols)
+
+    @classmethod
+    def from_reference(cls, names: List[str], X: np.ndarray, n_bins: int = 20) -> "StreamingSketch":
+        """
+        Build edges from the reference data's quantiles and load it in.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        qs = np.linspace(0.0, 1.0, n_bins + 1)[1:-1]
+        edges = np.nanquantile(X, qs, axis=0).T
+        sketch = cls(names, edges)
+        sketch.update_batch(X)
+        return sketch
+
+    def update(self, x: np.ndarray) -> None:
+        """
+        Add one observation (shape (n_cols,)).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        valid = ~np.isnan(x)
+        if not valid.all():
+            self.update_batch(x[None, :])   # rare: slow path that skips NaNs
+            return
+
+        bins = (x[:, None] >= self.edges).sum(axis=1)
+        self.counts[self._cols, bins] += 1
+
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+    def update_batch(self, X: np.ndarray) -> None:
+        """
+        Add many observations (shape (n_rows, n_cols)); merges exact moments.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        for j in range(len(self.names)):
+            col = X[:, j]
+            valid = col[~np.isnan(col)]
+            self.n_missing[j] += col.size - valid.size
+            if valid.size == 0:
+                continue
+            bins = np.searchsorted(self.edges[j], valid, side="right")
+            self.counts[j] += np.bincount(bins, minlength=self.counts.shape[1])
+
+            n_a, n_b = self.n[j], valid.size
+            mean_b = valid.mean()
+            m2_b = ((valid - mean_b) ** 2).sum()
+            delta = mean_b - self.mean[j]
+            total = n_a + n_b
+            self.mean[j] += delta * n_b / total
+            self.m2[j] += m2_b + delta ** 2 * n_a * n_b / total
+            self.n[j] = total
+            self.min[j] = min(self.min[j], valid.min())
+            self.max[j] = max(self.max[j], valid.max())
+
+    def empty_like(self) -> "StreamingSketch":
+        return StreamingSketch(self.names, self.edges)
+
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.m2 / np.maximum(self.n, 1))
+
+    def proportions(self) -> np.ndarray:
+        return self.counts / np.maximum(self.counts.sum(axis=1, keepdims=True), 1)
+
+    # -----------------------------
+    # Serialization
+    # -----------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "names": self.names,
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist(),
+            "n": self.n.tolist(),
+            "n_missing": self.n_missing.tolist(),
+            "mean": self.mean.tolist(),
+            "m2": self.m2.tolist(),
+            "min": self.min.tolist(),
+            "max": self.max.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StreamingSketch":
+        sketch = cls(data["names"], np.asarray(data["edges"]))
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        sketch.n = np.asarray(data["n"], dtype=np.int64)
+        sketch.n_missing = np.asarray(data["n_missing"], dtype=np.int64)
+        sketch.mean = np.asarray(data["mean"], dtype=np.float64)
+        sketch.m2 = np.asarray(data["m2"], dtype=np.float64)
+        sketch.min = np.asarray(data["min"], dtype=np.float64)
+        sketch.max = np.asarray(data["max"], dtype=np.float64)
+        return sketch
+
+
+# ============================================================
+# Drift scores
+# ============================================================
+
+def compare_sketches(reference: StreamingSketch, live: StreamingSketch) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-column PSI and (histogram-approximated) KS statistic of live vs reference.
+    """
+    p_ref = reference.proportions()
+    p_live = live.proportions()
+    psi = ((p_live - p_ref) * np.log((p_live + _EPS) / (p_ref + _EPS))).sum(axis=1)
+    ks = np.abs(np.cumsum(p_live, axis=1) - np.cumsum(p_ref, axis=1)).max(axis=1)
+    live_std = live.std()
+
+    report = {}
+    for j, name in enumerate(reference.names):
+        if live.n[j] == 0:
+            report[name] = {"n": 0}
+            continue
+        status = "stable"
+        if psi[j] > PSI_SIGNIFICANT:
+            status = "significant"
+        elif psi[j] > PSI_MODERATE:
+            status = "moderate"
+        report[name] = {
+            "n": int(live.n[j]),
+            "psi": float(psi[j]),
+            "ks": float(ks[j]),
+            "status": status,
+            "live_mean": float(live.mean[j]),
+            "reference_mean": float(reference.mean[j]),
+            "live_std": float(live_std[j]),
+            "reference_std": float(reference.std()[j]),
+        }
+    return report
+
+
+# ============================================================
+# Live monitor
+# ============================================================
+
+OUTPUT_NAMES: List[str] = ["mean_prob", "std"]
+
+
+class DriftMonitor:
+    """
+    Compares live /api/endpoint traffic against the reference sketches
+    saved with the model.
+
+    observe() only updates the live sketches. A background thread (see
+    start()) periodically scores the current window and rotates it, so each
+    report covers one interval; report() can also be called on demand.
+    """
+
+    def __init__(self, reference: Dict[str, Any]) -> None:
+        self.reference_features = StreamingSketch.from_dict(reference["features"])
+        self.reference_outputs = StreamingSketch.from_dict(reference["outputs"])
+        self._lock = threading.Lock()
+        self._window_started = time.time()
+        self.live_features = self.reference_features.empty_like()
+        self.live_outputs = self.reference_outputs.empty_like()
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def observe(self, features: np.ndarray, mean_prob: float, std: float) -> None:
+        outputs = np.array([mean_prob, std], dtype=np.float64)
+        with self._lock:
+            self.live_features.update(features)
+            self.live_outputs.update(outputs)
+
+    def report(self, rotate: bool = False) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            live_features, live_outputs = self.live_features, self.live_outputs
+            window_started = self._window_started
+            if rotate:
+                self.live_features = self.reference_features.empty_like()
+                self.live_outputs = self.reference_outputs.empty_like()
+                self._window_started = now
+
+        features = compare_sketches(self.reference_features, live_features)
+        outputs = compare_sketches(self.reference_outputs, live_outputs)
+        scored = [v for v in features.values() if "psi" in v]
+        return {
+            "window_start": window_started,
+            "window_end": now,
+            "n_requests": int(live_outputs.n.max()) if live_outputs.n.size else 0,
+            "max_feature_psi": max((v["psi"] for v in scored), default=0.0),
+            "drifted_features": sorted(k for k, v in features.items() if v.get("status") == "significant"),
+            "features": features,
+            "outputs": outputs,
+        }
+
+    def start(self, interval_s: float) -> None:
+        """
+        Score and rotate the live window every `interval_s` seconds.
+        """
+        if self._thread is not None or interval_s <= 0:
+            return
+
+        def _loop() -> None:
+            while True:
+                time.sleep(interval_s)
+                self.last_report = self.report(rotate=True)
+                print(
+                    f"[DriftMonitor] window of {self.last_report['n_requests']} requests, "
+                    f"max feature PSI {self.last_report['max_feature_psi']:.3f}"
+                )
+
+        self._thread = threading.Thread(target=_loop, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+
+def build_reference_profile(
+    feature_names: List[str],
+    X_raw: np.ndarray,
+    pred_mean: np.ndarray,
+    pred_std: np.ndarray,
+    n_bins: int = 20,
+) -> Dict[str, Any]:
+    """
+    Reference sketches of training inputs and predictions, stored with the model.
+    """
+    outputs = np.column_stack([pred_mean, pred_std])
+    return {
+        "features": StreamingSketch.from_reference(feature_names, X_raw, n_bins).to_dict(),
+        "outputs": StreamingSketch.from_reference(OUTPUT_NAMES, outputs, n_bins).to_dict(),
+    }
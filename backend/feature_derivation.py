@@ -0,0 +1,199 @@
+# feature_derivation.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Feature spec
+# ============================================================
+
+# Model inputs, in the column order the preprocessor and network expect
+NUMERIC_FEATURES: List[str] = [
+    "total_project_members",
+    "average_members_per_team",
+    "total_project_stories",
+    "total_story_points",
+    "average_story_points",
+    "number_of_low_priority_stories",
+    "number_of_medium_priority_stories",
+    "number_of_high_priority_stories",
+    "number_of_stories_in_progress",
+    "number_of_stories_completed",
+    "number_of_stories_todo",
+    "number_of_stories_in_review",
+    "number_of_different_teams",
+    "number_of_testing_stories",
+    "estimated_project_duration_in_days",
+    "number_of_epics",
+    "average_story_points_per_epic",
+    "average_story_points_per_engineer",
+    "average_seniority_level_per_engineer_in_days",
+    "average_time_of_story_completion_in_hours",
+    "average_time_of_stories_in_progress_in_hours",
+]
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    """
+    A model feature computed as `numerator / max(denominator, 1) * scale`.
+
+    If `denominator` is None the feature is a plain unit conversion.
+    `numerator_default` / `denominator_default` are used when the input
+    column is missing entirely (or NaN); otherwise a missing input leaves
+    the feature NaN so the preprocessor's imputer can fill it.
+    """
+    name: str
+    numerator: str
+    denominator: Optional[str] = None
+    scale: float = 1.0
+    numerator_default: Optional[float] = None
+    denominator_default: Optional[float] = None
+
+
+DERIVED_FEATURES: List[DerivedFeature] = [
+    DerivedFeature(
+        name="average_seniority_level_per_engineer_in_days",
+        numerator="average_seniority_level_per_engineer_in_years",
+        scale=365.0,
+        numerator_default=3.0,
+    ),
+    DerivedFeature(
+        name="average_members_per_team",
+        numerator="total_project_members",
+        denominator="number_of_different_teams",
+        denominator_default=1.0,
+    ),
+    DerivedFeature(
+        name="average_story_points",
+        numerator="total_story_points",
+        denominator="total_project_stories",
+    ),
+    DerivedFeature(
+        name="average_story_points_per_epic",
+        numerator="total_story_points",
+        denominator="number_of_epics",
+    ),
+    DerivedFeature(
+        name="average_story_points_per_engineer",
+        numerator="total_story_points",
+        denominator="total_project_members",
+    ),
+]
+
+DERIVED_FEATURE_NAMES: List[str] = [f.name for f in DERIVED_FEATURES]
+
+# Features that must come from the caller; everything else can be derived.
+BASE_FEATURES: List[str] = [f for f in NUMERIC_FEATURES if f not in DERIVED_FEATURE_NAMES]
+
+_unknown = [name for name in DERIVED_FEATURE_NAMES if name not in NUMERIC_FEATURES]
+if _unknown:
+    raise RuntimeError(f"DERIVED_FEATURES reference unknown model features: {_unknown}")
+
+
+# ============================================================
+# Column-wise derivation
+# ============================================================
+
+Batch = Union[pd.DataFrame, Mapping[str, Any], Sequence[Mapping[str, Any]]]
+
+
+def _to_frame(batch: Batch) -> pd.DataFrame:
+    if isinstance(batch, pd.DataFrame):
+        return batch
+    if isinstance(batch, Mapping):
+        return pd.DataFrame({k: np.atleast_1d(v) for k, v in batch.items()})
+    return pd.DataFrame(list(batch))
+
+
+def _column(df: pd.DataFrame, name: Optional[str], default: Optional[float]) -> np.ndarray:
+    n = len(df)
+    if name is not None and name in df.columns:
+        values = pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+    else:
+        values = np.full(n, np.nan)
+    if default is not None:
+        values = np.where(np.isnan(values), default, values)
+    return values
+
+
+def derive_features(batch: Batch, strict: bool = False) -> pd.DataFrame:
+    """
+    Return a float64 DataFrame with exactly NUMERIC_FEATURES (in order).
+
+    Derived features that the caller already supplied are kept as-is;
+    missing or NaN entries are computed from DERIVED_FEATURES column-wise.
+    Denominators are clamped to >= 1, matching the single-row rules used
+    at serving time and in the synthetic data generator.
+
+    With strict=True a ValueError is raised if any output value is still
+    missing (used on the request path, where a partial row is a client error).
+    """
+    df = _to_frame(batch)
+    out: Dict[str, np.ndarray] = {}
+
+    for name in BASE_FEATURES:
+        out[name] = _column(df, name, None)
+
+    for spec in DERIVED_FEATURES:
+        supplied = _column(df, spec.name, None)
+        numerator = _column(df, spec.numerator, spec.numerator_default)
+        if spec.denominator is None:
+            computed = numerator * spec.scale
+        else:
+            denominator = _column(df, spec.denominator, spec.denominator_default)
+            computed = numerator / np.maximum(denominator, 1.0) * spec.scale
+        out[spec.name] = np.where(np.isnan(supplied), computed, supplied)
+
+    result = pd.DataFrame({name: out[name] for name in NUMERIC_FEATURES}, index=df.index)
+
+    if strict:
+        missing = [name for name in NUMERIC_FEATURES if result[name].isna().any()]
+        if missing:
+            raise ValueError(f"Missing required input features: {missing}")
+
+    return result
+
+
+# ============================================================
+# What-if perturbations
+# ============================================================
+
+PERTURBABLE_FEATURES: List[str] = NUMERIC_FEATURES + [
+    f.numerator for f in DERIVED_FEATURES if f.numerator not in NUMERIC_FEATURES
+]
+
+
+def dependent_features(name: str) -> List[str]:
+    """
+    Derived features whose value is computed from input `name`.
+    """
+    return [f.name for f in DERIVED_FEATURES if name in (f.numerator, f.denominator)]
+
+
+def apply_overrides(batch: Batch, overrides: Mapping[str, Any]) -> pd.DataFrame:
+    """
+    Copy of `batch` with columns replaced by `overrides` (scalars or arrays).
+
+    Supplied values of derived features that depend on an overridden input
+    are cleared, so derive_features() recomputes them instead of keeping a
+    value that no longer matches (e.g. average_story_points after changing
+    total_story_points).
+    """
+    unknown = [name for name in overrides if name not in PERTURBABLE_FEATURES]
+    if unknown:
+        raise ValueError(f"Unknown input features: {unknown}")
+
+    df = _to_frame(batch).copy()
+    for name, values in overrides.items():
+        df[name] = values
+        for derived in dependent_features(name):
+            if derived not in overrides:
+                df[derived] = np.nan
+    return df
@@ -0,0 +1,356 @@
+# jira_ingest.py
+
+"""
+Turn raw Jira issue exports into the per-project inputs /api/endpoint takes.
+
+The export (CSV or JSON lines, one issue per row) is read in chunks and
+aggregated per project with vectorized group-bys, so memory grows with the
+number of projects (and their distinct assignees/teams), not with the
+number of issues:
+
+    python jira_ingest.py issues.jsonl --out projects.csv
+    python jira_ingest.py issues.csv --model engine.pt --portfolio-db portfolio.sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_derivation import derive_features
+
+
+# ============================================================
+# Raw issue schema
+# ============================================================
+
+@dataclass
+class IssueSchema:
+    """
+    Column names in the raw export. Optional columns may be absent; the
+    features they feed are then left missing (and imputed at scoring time).
+    """
+    project: str = "project_key"
+    issue_type: str = "issue_type"
+    priority: str = "priority"
+    status: str = "status"
+    story_points: str = "story_points"
+    assignee: str = "assignee"
+    team: str = "team"
+    created: str = "created"
+    started: str = "started"            # optional: first transition to In Progress
+    resolved: str = "resolved"          # optional
+    due_date: str = "due_date"          # optional
+    labels: str = "labels"              # optional, comma/space separated
+    seniority_years: str = "assignee_seniority_years"   # optional
+
+
+PRIORITY_MAP: Dict[str, str] = {
+    "lowest": "low", "low": "low", "minor": "low", "trivial": "low",
+    "medium": "medium", "major": "medium", "normal": "medium",
+    "high": "high", "highest": "high", "critical": "high", "blocker": "high",
+}
+
+STATUS_MAP: Dict[str, str] = {
+    "to do": "todo", "todo": "todo", "open": "todo", "backlog": "todo",
+    "selected for development": "todo", "reopened": "todo",
+    "in progress": "in_progress", "in development": "in_progress",
+    "in review": "in_review", "code review": "in_review", "review": "in_review",
+    "done": "completed", "closed": "completed", "resolved": "completed",
+}
+
+EPIC_TYPES = {"epic"}
+SKIPPED_TYPES = {"sub-task", "subtask"}          # counted through their parent story
+TESTING_TYPES = {"test", "test case", "qa"}
+TESTING_LABELS = ("test", "testing", "qa")
+
+# Per-project running totals, all additive across chunks.
+_SUM_COLUMNS: List[str] = [
+    "n_stories", "n_epics", "story_points", "n_low", "n_medium", "n_high",
+    "n_todo", "n_in_progress", "n_in_review", "n_completed", "n_testing",
+    "completion_hours_sum", "completion_hours_n",
+    "in_progress_hours_sum", "in_progress_hours_n",
+]
+
+
+def _lower(series: pd.Series) -> pd.Series:
+    return series.astype("string").str.strip().str.lower()
+
+
+def _timestamps(chunk: pd.DataFrame, column: str) -> pd.Series:
+    if column not in chunk.columns:
+        return pd.Series(pd.NaT, index=chunk.index, dtype="datetime64[ns, UTC]")
+    return pd.to_datetime(chunk[column], utc=True, errors="coerce")
+
+
+def _hours(later: pd.Series, earlier: pd.Series) -> pd.Series:
+    return (later - earlier).dt.total_seconds() / 3600.0
+
+
+# ============================================================
+# Chunked aggregation
+# ============================================================
+
+class IssueAggregator:
+    """
+    One-pass, chunk-at-a-time aggregation of raw issues into per-project
+    totals. Feed chunks with add_chunk(), then call project_inputs().
+    """
+
+    def __init__(self, schema: Optional[IssueSchema] = None, as_of: Optional[pd.Timestamp] = None) -> None:
+        self.schema = schema or IssueSchema()
+        # In-progress age is measured up to this instant
+        self.as_of = pd.Timestamp(as_of or pd.Timestamp.now(tz="UTC"))
+        if self.as_of.tzinfo is None:
+            self.as_of = self.as_of.tz_localize("UTC")
+        self.totals = pd.DataFrame(columns=_SUM_COLUMNS, dtype=np.float64)
+        self.first_created = pd.Series(dtype="datetime64[ns, UTC]")
+        self.last_due = pd.Series(dtype="datetime64[ns, UTC]")
+        # Distinct (project, assignee) and (project, team) pairs
+        self.members = pd.DataFrame(columns=["project", "assignee", "seniority"])
+        self.teams = pd.DataFrame(columns=["project", "team"])
+        self.n_issues = 0
+
+    def add_chunk(self, chunk: pd.DataFrame) -> None:
+        s = self.schema
+        if s.project not in chunk.columns:
+            raise ValueError(f"Issue export is missing the project column {s.project!r}")
+        chunk = chunk[chunk[s.project].notna()]
+        self.n_issues += len(chunk)
+        if chunk.empty:
+            return
+
+        project = chunk[s.project].astype(str)
+        if s.issue_type in chunk.columns:
+            issue_type = _lower(chunk[s.issue_type])
+        else:
+            issue_type = pd.Series("story", index=chunk.index)
+        is_epic = issue_type.isin(EPIC_TYPES).to_numpy(dtype=bool)
+        is_story = ~is_epic & ~issue_type.isin(SKIPPED_TYPES).to_numpy(dtype=bool)
+
+        priority = _lower(chunk[s.priority]).map(PRIORITY_MAP) if s.priority in chunk.columns else None
+        status = _lower(chunk[s.status]).map(STATUS_MAP) if s.status in chunk.columns else None
+
+        is_testing = issue_type.isin(TESTING_TYPES).to_numpy(dtype=bool)
+        if s.labels in chunk.columns:
+            labels = _lower(chunk[s.labels]).fillna("")
+            pattern = r"\b(?:" + "|".join(TESTING_LABELS) + r")\b"
+            is_testing = is_testing | labels.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+
+        created = _timestamps(chunk, s.created)
+        started = _timestamps(chunk, s.started).fillna(created)
+        resolved = _timestamps(chunk, s.resolved)
+        completion_hours = _hours(resolved, started)
+        in_progress_hours = _hours(pd.Series(self.as_of, index=chunk.index), started)
+
+        def story_flag(mask) -> np.ndarray:
+            return (is_story & np.asarray(mask, dtype=bool)).astype(np.float64)
+
+        is_completed = story_flag(status == "completed") if status is not None else np.zeros(len(chunk))
+        is_in_progress = story_flag(status == "in_progress") if status is not None else np.zeros(len(chunk))
+        completion_ok = is_completed.astype(bool) & completion_hours.notna().to_numpy()
+        in_progress_ok = is_in_progress.astype(bool) & in_progress_hours.notna().to_numpy()
+
+        if s.story_points in chunk.columns:
+            points = pd.to_numeric(chunk[s.story_points], errors="coerce").fillna(0.0)
+        else:
+            points = pd.Series(0.0, index=chunk.index)
+        frame = pd.DataFrame(
+            {
+                "n_stories": is_story.astype(np.float64),
+                "n_epics": is_epic.astype(np.float64),
+                "story_points": np.where(is_story, points.to_numpy(), 0.0),
+                "n_low": story_flag(priority == "low") if priority is not None else 0.0,
+                "n_medium": story_flag(priority == "medium") if priority is not None else 0.0,
+                "n_high": story_flag(priority == "high") if priority is not None else 0.0,
+                "n_todo": story_flag(status == "todo") if status is not None else 0.0,
+                "n_in_progress": is_in_progress,
+                "n_in_review": story_flag(status == "in_review") if status is not None else 0.0,
+                "n_completed": is_completed,
+                "n_testing": story_flag(is_testing),
+                "completion_hours_sum": np.where(completion_ok, completion_hours.to_numpy(), 0.0),
+                "completion_hours_n": completion_ok.astype(np.float64),
+                "in_progress_hours_sum": np.where(in_progress_ok, in_progress_hours.to_numpy(), 0.0),
+                "in_progress_hours_n": in_progress_ok.astype(np.float64),
+            },
+            index=chunk.index,
+        )
+        frame["project"] = project
+        self.totals = self.totals.add(frame.groupby("project", sort=False).sum(), fill_value=0.0)
+
+        self.first_created = self._combine(self.first_created, created.groupby(project).min(), "min")
+        due = _timestamps(chunk, s.due_date)
+        self.last_due = self._combine(self.last_due, due.groupby(project).max(), "max")
+
+        if s.assignee in chunk.columns:
+            seniority = (
+                pd.to_numeric(chunk[s.seniority_years], errors="coerce")
+                if s.seniority_years in chunk.columns else np.nan
+            )
+            members = pd.DataFrame({"project": project, "assignee": chunk[s.assignee], "seniority": seniority})
+            members = members.dropna(subset=["assignee"])
+            self.members = self._distinct(self.members, members, ["project", "assignee"])
+        if s.team in chunk.columns:
+            teams = pd.DataFrame({"project": project, "team": chunk[s.team]}).dropna()
+            self.teams = self._distinct(self.teams, teams, ["project", "team"])
+
+    @staticmethod
+    def _distinct(running: pd.DataFrame, update: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+        combined = update if running.empty else pd.concat([running, update], ignore_index=True)
+        return combined.drop_duplicates(subset=keys, keep="last").reset_index(drop=True)
+
+    @staticmethod
+    def _combine(running: pd.Series, update: pd.Series, how: str) -> pd.Series:
+        if running.empty:
+            return update
+        both = pd.concat([running, update], axis=1)
+        return both.min(axis=1) if how == "min" else both.max(axis=1)
+
+    def project_inputs(self) -> pd.DataFrame:
+        """
+        One row per project with the same raw fields the frontend sends to
+        /api/endpoint (see return_jira_object in server.py) plus project_id.
+        """
+        t = self.totals
+        projects = t.index
+        members = self.members.groupby("project")
+        n_members = members["assignee"].nunique().reindex(projects)
+        seniority = members["seniority"].mean().reindex(projects)
+        n_teams = self.teams.groupby("project")["team"].nunique().reindex(projects)
+
+        duration = (self.last_due.reindex(projects) - self.first_created.reindex(projects)).dt.total_seconds() / 86400.0
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            completion = t["completion_hours_sum"] / t["completion_hours_n"].replace(0, np.nan)
+            in_progress = t["in_progress_hours_sum"] / t["in_progress_hours_n"].replace(0, np.nan)
+
+        out = pd.DataFrame(
+            {
+                "project_id": projects.astype(str),
+                "total_project_members": n_members.to_numpy(dtype=np.float64),
+                "total_project_stories": t["n_stories"].to_numpy(),
+                "total_story_points": t["story_points"].to_numpy(),
+                "number_of_low_priority_stories": t["n_low"].to_numpy(),
+                "number_of_medium_priority_stories": t["n_medium"].to_numpy(),
+                "number_of_high_priority_stories": t["n_high"].to_numpy(),
+                "number_of_stories_in_progress": t["n_in_progress"].to_numpy(),
+                "number_of_stories_completed": t["n_completed"].to_numpy(),
+                "number_of_stories_todo": t["n_todo"].to_numpy(),
+                "number_of_stories_in_review": t["n_in_review"].to_numpy(),
+                "number_of_different_teams": n_teams.to_numpy(dtype=np.float64),
+                "number_of_testing_stories": t["n_testing"].to_numpy(),
+                "estimated_project_duration_in_days": duration.to_numpy(dtype=np.float64),
+                "number_of_epics": t["n_epics"].to_numpy(),
+                "average_seniority_level_per_engineer_in_years": seniority.to_numpy(dtype=np.float64),
+                "average_time_of_story_completion_in_hours": completion.to_numpy(dtype=np.float64),
+                "average_time_of_stories_in_progress_in_hours": in_progress.to_numpy(dtype=np.float64),
+            }
+        )
+        return out.reset_index(drop=True)
+
+
+# ============================================================
+# Readers
+# ============================================================
+
+def read_issue_chunks(path: str, chunk_size: int = 100_000, fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream an issue export in chunks; format is inferred from the extension
+    (.csv[.gz] or .jsonl/.ndjson/.json[.gz] as JSON lines) unless given.
+    """
+    if fmt is None:
+        name = path.lower()
+        for suffix in (".gz", ".bz2", ".zip", ".xz", ".zst"):
+            if name.endswith(suffix):
+                name = name[: -len(suffix)]
+        fmt = "csv" if name.endswith(".csv") else "jsonl"
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, low_memory=False)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False)
+    else:
+        raise ValueError(f"Unknown issue export format {fmt!r} (expected 'csv' or 'jsonl')")
+
+
+def ingest_issues(
+    path: str,
+    schema: Optional[IssueSchema] = None,
+    chunk_size: int = 100_000,
+    fmt: Optional[str] = None,
+    as_of: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Aggregate a raw issue export into one row of raw project inputs per project.
+    """
+    start = time.perf_counter()
+    aggregator = IssueAggregator(schema, as_of=as_of)
+    for chunk in read_issue_chunks(path, chunk_size=chunk_size, fmt=fmt):
+        aggregator.add_chunk(chunk)
+    projects = aggregator.project_inputs()
+    print(
+        f"[jira_ingest] {aggregator.n_issues} issues -> {len(projects)} projects "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return projects
+
+
+def issues_to_features(path: str, **kwargs) -> pd.DataFrame:
+    """
+    project_id plus NUMERIC_FEATURES, ready for RiskEngine.transform_features().
+    """
+    projects = ingest_issues(path, **kwargs)
+    features = derive_features(projects)
+    features.insert(0, "project_id", projects["project_id"].to_numpy())
+    return features
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Aggregate raw Jira issues into project features.")
+    parser.add_argument("path", help="issue export (.csv or JSON lines)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="issues read per chunk")
+    parser.add_argument("--as-of", default=None, help="timestamp in-progress ages are measured to")
+    parser.add_argument("--out", default=None, help="write project inputs here (.csv or .parquet)")
+    parser.add_argument("--model", default=None, help="saved RiskEngine to score the projects with")
+    parser.add_argument("--portfolio-db", default="portfolio.sqlite",
+                        help="SQLite store updated when --model is given")
+    args = parser.parse_args(argv)
+
+    projects = ingest_issues(
+        args.path,
+        chunk_size=args.chunk_size,
+        fmt=args.format,
+        as_of=pd.Timestamp(args.as_of) if args.as_of else None,
+    )
+
+    if args.out:
+        if args.out.endswith(".parquet"):
+            projects.to_parquet(args.out, index=False)
+        else:
+            projects.to_csv(args.out, index=False)
+        print(f"[jira_ingest] Wrote {os.path.abspath(args.out)}")
+
+    if args.model:
+        from portfolio import PortfolioStore, score_portfolio
+        from risk_engine_core import RiskEngine
+
+        engine = RiskEngine.load(args.model)
+        store = PortfolioStore(args.portfolio_db)
+        try:
+            print(f"[jira_ingest] {score_portfolio(engine, projects, store)}")
+        finally:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# model_registry.py
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from risk_engine_core import RiskEngine
+
+
+# Tenant ids and versions become path components, so keep them boring.
+_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+ARTIFACT_SUFFIX = ".pt"
+CURRENT_FILE = "CURRENT"
+
+
+class UnknownModelError(LookupError):
+    """
+    Raised when a tenant (or the requested version) has no saved engine.
+    """
+
+
+def _check_name(kind: str, value: str) -> str:
+    if not isinstance(value, str) or not _NAME_RE.match(value):
+        raise UnknownModelError(f"Invalid {kind} {value!r}")
+    return value
+
+
+def estimate_engine_bytes(engine: RiskEngine) -> int:
+    """
+    Resident size of an engine: weights and buffers plus the (small)
+    preprocessor and drift reference, approximated by their pickled size.
+    """
+    import pickle
+
+    model_bytes = sum(t.numel() * t.element_size() for t in engine.model.state_dict().values())
+    extras = pickle.dumps((engine.preprocessor, engine.reference_profile), protocol=pickle.HIGHEST_PROTOCOL)
+    return model_bytes + len(extras)
+
+
+class _Load:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.engine: Optional[RiskEngine] = None
+        self.error: Optional[BaseException] = None
+
+
+# ============================================================
+# Registry
+# ============================================================
+
+class ModelRegistry:
+    """
+    Per-tenant RiskEngines saved under `root`:
+
+        root/<tenant>/<version>.pt    one artifact per version (RiskEngine.save)
+        root/<tenant>/CURRENT         names the version to serve
+
+    Versions default to the engine's model_version, a content hash with
+    no ordering, so the served version always comes from CURRENT (written
+    by publish()); a tenant without one has no servable model.
+
+    Engines are loaded on first use and kept in an LRU bounded by
+    `max_bytes`; concurrent requests for an engine that is still loading
+    wait on the same load instead of reading the artifact again.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        loader: Callable[[str], RiskEngine] = RiskEngine.load,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._engines: "OrderedDict[Tuple[str, str], Tuple[RiskEngine, int]]" = OrderedDict()
+        self._loading: Dict[Tuple[str, str], _Load] = {}
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    # -----------------------------
+    # Layout
+    # -----------------------------
+    def _tenant_dir(self, tenant: str) -> str:
+        return os.path.join(self.root, _check_name("tenant", tenant))
+
+    def tenants(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if _NAME_RE.match(name) and os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def resolve(self, tenant: str, version: Optional[str] = None) -> Tuple[str, str]:
+        """
+        (version, artifact path) to serve for a tenant.
+        """
+        tenant_dir = self._tenant_dir(tenant)
+        if version is None:
+            current = os.path.join(tenant_dir, CURRENT_FILE)
+            if not os.path.exists(current):
+                raise UnknownModelError(f"No current model registered for tenant {tenant!r}")
+            with open(current) as f:
+                version = f.read().strip()
+
+        path = os.path.join(tenant_dir, _check_name("version", version) + ARTIFACT_SUFFIX)
+        if not os.path.exists(path):
+            raise UnknownModelError(f"Tenant {tenant!r} has no model version {version!r}")
+        return version, path
+
+    def publish(
+        self, tenant: str, engine: RiskEngine, version: Optional[str] = None, make_current: bool = True
+    ) -> str:
+        """
+        Save an engine as a new tenant version (defaults to its model_version).
+        """
+        version = _check_name("version", version or engine.model_version or engine.compute_model_version())
+        tenant_dir = self._tenant_dir(tenant)
+        os.makedirs(tenant_dir, exist_ok=True)
+
+        path = os.path.join(tenant_dir, version + ARTIFACT_SUFFIX)
+        tmp_path = path + ".tmp"
+        engine.save(tmp_path)
+        os.replace(tmp_path, path)
+
+        if make_current:
+            tmp_current = os.path.join(tenant_dir, CURRENT_FILE + ".tmp")
+            with open(tmp_current, "w") as f:
+                f.write(version)
+            os.replace(tmp_current, os.path.join(tenant_dir, CURRENT_FILE))
+        print(f"[ModelRegistry] Published {tenant}/{version}")
+        return version
+
+    # -----------------------------
+    # Loading + LRU
+    # -----------------------------
+    def get(self, tenant: str, version: Optional[str] = None) -> RiskEngine:
+        """
+        Engine for a tenant, loading it if needed.
+        """
+        version, path = self.resolve(tenant, version)
+        key = (tenant, version)
+
+        with self._lock:
+            entry = self._engines.get(key)
+            if entry is not None:
+                self._engines.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            load = self._loading.get(key)
+            leader = load is None
+            if leader:
+                load = self._loading[key] = _Load()
+
+        if not leader:
+            load.event.wait()
+            if load.error is not None:
+                raise load.error
+            return load.engine
+
+        try:
+            print(f"[ModelRegistry] Loading {tenant}/{version} from {path}")
+            engine = self._loader(path)
+            size = estimate_engine_bytes(engine)
+        except BaseException as e:
+            load.error = e
+            raise
+        else:
+            load.engine = engine
+            with self._lock:
+                self._engines[key] = (engine, size)
+                self.resident_bytes += size
+                self.loads += 1
+                self._evict_locked(keep=key)
+            return engine
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            load.event.set()
+
+    def _evict_locked(self, keep: Tuple[str, str]) -> None:
+        # Evicted engines stay valid for requests already holding them;
+        # they are only dropped from the cache.
+        while self.resident_bytes > self.max_bytes and len(self._engines) > 1:
+            key = next(iter(self._engines))
+            if key == keep:
+                break
+            _, size = self._engines.pop(key)
+            self.resident_bytes -= size
+            self.evictions += 1
+            print(f"[ModelRegistry] Evicted {key[0]}/{key[1]}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            resident = [
+                {"tenant": t, "version": v, "bytes": size}
+                for (t, v), (_, size) in self._engines.items()
+            ]
+            loading = len(self._loading)
+        return {
+            "root": self.root,
+            "max_bytes": self.max_bytes,
+            "resident_bytes": self.resident_bytes,
+            "resident": resident,
+            "loading": loading,
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+        }
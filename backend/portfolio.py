@@ -0,0 +1,226 @@
+# portfolio.py
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from risk_engine_core import RiskEngine, categorize_risk
+from feature_derivation import derive_features
+
+
+# SQLite's default limit on bound parameters per statement is 999.
+_SQL_BATCH = 900
+
+RESULT_COLUMNS: List[str] = [
+    "project_id",
+    "fingerprint",
+    "model_version",
+    "mean_prob",
+    "std",
+    "ci_5",
+    "ci_95",
+    "risk_category",
+    "scored_at",
+]
+
+
+# ============================================================
+# Persistent result store
+# ============================================================
+
+class PortfolioStore:
+    """
+    Embedded SQLite store of the latest prediction per project.
+
+    Each row remembers the fingerprint of the feature vector it was scored
+    from and the model version that scored it, so unchanged projects can be
+    skipped on the next run.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS portfolio_scores (
+                    project_id    TEXT PRIMARY KEY,
+                    fingerprint   TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    mean_prob     REAL NOT NULL,
+                    std           REAL NOT NULL,
+                    ci_5          REAL NOT NULL,
+                    ci_95         REAL NOT NULL,
+                    risk_category TEXT NOT NULL,
+                    scored_at     REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_portfolio_category "
+                "ON portfolio_scores (risk_category, mean_prob DESC)"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_fingerprints(self, project_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        project_id -> (fingerprint, model_version) for the ids already stored.
+        """
+        found: Dict[str, Tuple[str, str]] = {}
+        with self._lock:
+            for start in range(0, len(project_ids), _SQL_BATCH):
+                batch = project_ids[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    "SELECT project_id, fingerprint, model_version FROM portfolio_scores "
+                    f"WHERE project_id IN ({placeholders})",
+                    batch,
+                )
+                for row in rows:
+                    found[row["project_id"]] = (row["fingerprint"], row["model_version"])
+        return found
+
+    def upsert(self, records: Iterable[Tuple]) -> None:
+        """
+        Insert or replace rows given as tuples in RESULT_COLUMNS order.
+        """
+        columns = ", ".join(RESULT_COLUMNS)
+        placeholders = ", ".join("?" * len(RESULT_COLUMNS))
+        updates = ", ".join(f"{c} = excluded.{c}" for c in RESULT_COLUMNS[1:])
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT INTO portfolio_scores ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(project_id) DO UPDATE SET {updates}",
+                records,
+            )
+
+    # -----------------------------
+    # Dashboard queries
+    # -----------------------------
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM portfolio_scores WHERE project_id = ?", (project_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def query(
+        self,
+        risk_category: Optional[str] = None,
+        min_prob: Optional[float] = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Projects ordered by descending risk, optionally filtered.
+        """
+        clauses, params = [], []
+        if risk_category is not None:
+            clauses.append("risk_category = ?")
+            params.append(risk_category)
+        if min_prob is not None:
+            clauses.append("mean_prob >= ?")
+            params.append(float(min_prob))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM portfolio_scores {where} "
+                "ORDER BY mean_prob DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT risk_category, COUNT(*) AS n, AVG(mean_prob) AS avg_prob "
+                "FROM portfolio_scores GROUP BY risk_category"
+            ).fetchall()
+        by_category = {row["risk_category"]: {"count": row["n"], "avg_prob": row["avg_prob"]} for row in rows}
+        return {
+            "n_projects": sum(v["count"] for v in by_category.values()),
+            "by_category": by_category,
+        }
+
+
+# ============================================================
+# Incremental scoring job
+# ============================================================
+
+def fingerprint_rows(features: pd.DataFrame) -> List[str]:
+    """
+    Content hash of each prepared feature vector (float64, NUMERIC_FEATURES order).
+    """
+    values = np.ascontiguousarray(features.to_numpy(dtype=np.float64))
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest() for row in values]
+
+
+def score_portfolio(
+    engine: RiskEngine,
+    projects: pd.DataFrame,
+    store: PortfolioStore,
+    id_col: str = "project_id",
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Score only the projects whose features or model version changed.
+
+    `projects` holds one raw project per row (the same fields /api/endpoint
+    accepts) plus an id column. Rows whose fingerprint and model version
+    match the store are skipped; the rest are scored in one batched MC call
+    and upserted.
+    """
+    start = time.perf_counter()
+    if id_col not in projects.columns:
+        raise ValueError(f"Projects are missing the id column {id_col!r}")
+
+    projects = projects.drop_duplicates(subset=id_col, keep="last").reset_index(drop=True)
+    project_ids = projects[id_col].astype(str).tolist()
+    features = derive_features(projects)
+    fingerprints = fingerprint_rows(features)
+    model_version = engine.model_version or engine.compute_model_version()
+
+    stored = {} if force else store.get_fingerprints(project_ids)
+    changed = [
+        i for i, (pid, fp) in enumerate(zip(project_ids, fingerprints))
+        if stored.get(pid) != (fp, model_version)
+    ]
+
+    if changed:
+        X = engine.transform_features(features.iloc[changed])
+        mc_result = engine.predict_batch(X, keep_samples=False)
+        now = time.time()
+        store.upsert(
+            (
+                project_ids[i],
+                fingerprints[i],
+                model_version,
+                float(mc_result["mean"][k]),
+                float(mc_result["std"][k]),
+                float(mc_result["ci_5"][k]),
+                float(mc_result["ci_95"][k]),
+                categorize_risk(float(mc_result["mean"][k])),
+                now,
+            )
+            for k, i in enumerate(changed)
+        )
+
+    return {
+        "n_projects": len(project_ids),
+        "n_scored": len(changed),
+        "n_skipped": len(project_ids) - len(changed),
+        "model_version": model_version,
+        "elapsed_s": time.perf_counter() - start,
+    }
@@ -0,0 +1,220 @@
+# profiling.py
+
+from __future__ import annotations
+
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Dict, Iterator, List, Optional
+
+import torch
+
+
+PROFILE_BACKENDS = ("cprofile", "torch")
+
+
+# ============================================================
+# Bounded on-disk ring of trace files
+# ============================================================
+
+class ProfileRing:
+    """
+    Directory of profile captures that never holds more than `max_files`.
+
+    Files are named `<seq>_<label>.<ext>` so a plain directory listing is in
+    capture order; the oldest capture is deleted once the ring is full.
+    """
+
+    _NAME_RE = re.compile(r"^(\d{6})_.+\.(pstats|json)$")
+
+    def __init__(self, output_dir: str, max_files: int = 20) -> None:
+        self.output_dir = output_dir
+        self.max_files = max(int(max_files), 1)
+        self._lock = threading.Lock()
+        os.makedirs(self.output_dir, exist_ok=True)
+        existing = self.list_files()
+        self._seq = int(existing[-1].split("_", 1)[0]) + 1 if existing else 0
+
+    def list_files(self) -> List[str]:
+        names = [n for n in os.listdir(self.output_dir) if self._NAME_RE.match(n)]
+        return sorted(names)
+
+    def next_path(self, label: str, ext: str) -> str:
+        """
+        Reserve a path for a new capture, evicting the oldest files if needed.
+        """
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "-", label).strip("-") or "capture"
+        with self._lock:
+            seq = self._seq % 1_000_000
+            self._seq += 1
+            existing = self.list_files()
+            for name in existing[: max(len(existing) - self.max_files + 1, 0)]:
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                except FileNotFoundError:
+                    pass
+            return os.path.join(self.output_dir, f"{seq:06d}_{safe_label}.{ext}")
+
+
+# ============================================================
+# Capture helpers
+# ============================================================
+
+# Only one profiler can be attached to the interpreter at a time (cProfile
+# refuses to nest from 3.12 on), so captures are serialized process-wide and
+# a request that loses the race simply runs unprofiled.
+_capture_lock = threading.Lock()
+
+
+@contextmanager
+def capture(ring: ProfileRing, label: str, backend: str = "cprofile") -> Iterator[Optional[str]]:
+    """
+    Profile the enclosed block and write the result into `ring`.
+
+    Yields the output path, or None if another capture was already running.
+    cProfile writes a `.pstats` file; the torch backend writes a Chrome trace
+    (`.json`, open with chrome://tracing or Perfetto).
+    """
+    if backend not in PROFILE_BACKENDS:
+        raise ValueError(f"Unknown profile backend {backend!r}, expected one of {PROFILE_BACKENDS}")
+
+    if not _capture_lock.acquire(blocking=False):
+        yield None
+        return
+
+    try:
+        if backend == "torch":
+            activities = [torch.profiler.ProfilerActivity.CPU]
+            if torch.cuda.is_available():
+                activities.append(torch.profiler.ProfilerActivity.CUDA)
+            path = ring.next_path(label, "json")
+            with torch.profiler.profile(activities=activities, record_shapes=True) as prof:
+                yield path
+            prof.export_chrome_trace(path)
+        else:
+            path = ring.next_path(label, "pstats")
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield path
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
+    finally:
+        _capture_lock.release()
+
+
+# ============================================================
+# Sampled request profiler
+# ============================================================
+
+@dataclass
+class ProfilerConfig:
+    sample_rate: float = 0.0          # fraction of requests to profile
+    next_n: int = 0                   # profile the next N requests regardless of sample_rate
+    backend: str = "cprofile"         # "cprofile" (pstats) or "torch" (Chrome trace)
+    output_dir: str = "profiles"
+    max_files: int = 20
+
+
+# Settings the admin endpoint may change; output_dir is deliberately absent.
+RUNTIME_SETTINGS = ("sample_rate", "next_n", "backend", "max_files")
+
+
+def config_from_env(prefix: str = "RISK_PROFILE_") -> ProfilerConfig:
+    """
+    Build a ProfilerConfig from environment variables, e.g.
+    RISK_PROFILE_SAMPLE_RATE=0.05 RISK_PROFILE_BACKEND=torch.
+    """
+    defaults = ProfilerConfig()
+    return ProfilerConfig(
+        sample_rate=float(os.getenv(prefix + "SAMPLE_RATE", defaults.sample_rate)),
+        next_n=int(os.getenv(prefix + "NEXT_N", defaults.next_n)),
+        backend=os.getenv(prefix + "BACKEND", defaults.backend),
+        output_dir=os.getenv(prefix + "DIR", defaults.output_dir),
+        max_files=int(os.getenv(prefix + "MAX_FILES", defaults.max_files)),
+    )
+
+
+class RequestProfiler:
+    """
+    Decides which live requests get profiled and captures them into a ring.
+
+    Disabled (sample_rate == 0 and next_n == 0) it costs one lock-free check
+    per request.
+    """
+
+    def __init__(self, config: Optional[ProfilerConfig] = None) -> None:
+        self.config = config or ProfilerConfig()
+        self._lock = threading.Lock()
+        self._ring: Optional[ProfileRing] = None
+        self.n_captured = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.next_n > 0 or self.config.sample_rate > 0.0
+
+    @property
+    def ring(self) -> ProfileRing:
+        if self._ring is None or self._ring.output_dir != self.config.output_dir:
+            self._ring = ProfileRing(self.config.output_dir, self.config.max_files)
+        self._ring.max_files = max(int(self.config.max_files), 1)
+        return self._ring
+
+    def update(self, **changes: Any) -> ProfilerConfig:
+        """
+        Change settings at runtime (used by the admin endpoint).
+
+        Only RUNTIME_SETTINGS can be changed; output_dir stays env-only.
+        The new config is validated as a whole and swapped in only if it
+        passes, so a rejected update leaves the old one in place.
+        """
+        unknown = [key for key in changes if key not in RUNTIME_SETTINGS]
+        if unknown:
+            raise ValueError(f"Unknown or read-only profiler settings: {unknown}")
+        with self._lock:
+            candidate = replace(
+                self.config,
+                **{key: type(getattr(self.config, key))(value) for key, value in changes.items()},
+            )
+            if candidate.backend not in PROFILE_BACKENDS:
+                raise ValueError(f"Unknown profile backend {candidate.backend!r}")
+            if not 0.0 <= candidate.sample_rate <= 1.0:
+                raise ValueError("sample_rate must be between 0 and 1")
+            if candidate.next_n < 0 or candidate.max_files < 1:
+                raise ValueError("next_n must be >= 0 and max_files >= 1")
+            self.config = candidate
+        return self.config
+
+    def _should_profile(self) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self.config.next_n > 0:
+                self.config.next_n -= 1
+                return True
+        return random.random() < self.config.sample_rate
+
+    def profile(self, label: str):
+        """
+        Context manager wrapping one request; a no-op unless it is sampled.
+        """
+        if not self._should_profile():
+            return nullcontext(None)
+        self.n_captured += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return capture(self.ring, f"{label}_{stamp}", self.config.backend)
+
+    def status(self) -> Dict[str, Any]:
+        files = self.ring.list_files() if os.path.isdir(self.config.output_dir) else []
+        return {
+            "config": asdict(self.config),
+            "enabled": self.enabled,
+            "n_captured": self.n_captured,
+            "files": files,
+        }
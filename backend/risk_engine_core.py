@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional, Any
 
@@ -20,35 +21,16 @@ from sklearn.metrics import roc_auc_score, confusion_matrix, classification_repo
 
 import matplotlib.pyplot as plt
 
+from profiling import ProfileRing, capture
+from drift import build_reference_profile
+from feature_derivation import DERIVED_FEATURES, NUMERIC_FEATURES, apply_overrides, derive_features
+
 
 # ============================================================
 # Data schema
 # ============================================================
 
-NUMERIC_FEATURES: List[str] = [
-    "total_project_members",
-    "average_members_per_team",
-    "total_project_stories",
-    "total_story_points",
-    "average_story_points",
-    "number_of_low_priority_stories",
-    "number_of_medium_priority_stories",
-    "number_of_high_priority_stories",
-    "number_of_stories_in_progress",
-    "number_of_stories_completed",
-    "number_of_stories_todo",
-    "number_of_stories_in_review",
-    "number_of_different_teams",
-    "number_of_testing_stories",
-    "estimated_project_duration_in_days",
-    "number_of_epics",
-    "average_story_points_per_epic",
-    "average_story_points_per_engineer",
-    "average_seniority_level_per_engineer_in_days",
-    "average_time_of_story_completion_in_hours",
-    "average_time_of_stories_in_progress_in_hours",
-]
-
+# NUMERIC_FEATURES is defined in feature_derivation, next to the derived-feature spec.
 CATEGORICAL_FEATURES: List[str] = []  # none in the synthetic data right now
 LABEL_COL: str = "is_delayed"
 
@@ -134,6 +116,18 @@ class JiraPreprocessor:
     def fit_transform(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         return self.fit(df).transform(df)
 
+    def numeric_scaler_params(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (mean, scale) of the fitted StandardScaler, in numeric_features order.
+
+        Lets callers reproduce the numeric transform in torch, e.g. to
+        differentiate predictions with respect to unscaled inputs.
+        """
+        if not self._fitted:
+            raise RuntimeError("JiraPreprocessor must be fitted before reading scaler params.")
+        scaler = self.column_transformer.named_transformers_["num"].named_steps["scaler"]
+        return scaler.mean_.astype(np.float32), scaler.scale_.astype(np.float32)
+
 
 # ============================================================
 # Dataset + DataLoaders
@@ -199,6 +193,7 @@ class BayesianDropoutMLP(nn.Module):
         if hidden_dims is None:
             hidden_dims = [64, 64]
 
+        self.input_dim = input_dim
         layers: List[nn.Module] = []
         prev_dim = input_dim
 
@@ -216,6 +211,42 @@ class BayesianDropoutMLP(nn.Module):
         logits = self.output_layer(h)
         return logits
 
+    def sample_dropout_masks(
+        self,
+        n_samples: int,
+        n_rows: int = 1,
+        generator: Optional[torch.Generator] = None,
+        device: str = "cpu",
+    ) -> List[torch.Tensor]:
+        """
+        Draw one inverted-dropout mask per Dropout layer, each of shape
+        (n_samples, n_rows, width). Use n_rows=1 to share masks across a batch.
+        """
+        masks = []
+        width = None
+        for module in self.feature_extractor:
+            if isinstance(module, nn.Linear):
+                width = module.out_features
+            elif isinstance(module, nn.Dropout):
+                keep = 1.0 - module.p
+                u = torch.rand((n_samples, n_rows, width), generator=generator, device=device)
+                masks.append((u < keep).float() / keep)
+        return masks
+
+    def forward_with_masks(self, x: torch.Tensor, masks: List[torch.Tensor]) -> torch.Tensor:
+        """
+        MC forward pass with explicit dropout masks from sample_dropout_masks().
+
+        x has shape (n_rows, input_dim); returns logits of shape
+        (n_samples, n_rows). Layers before the first mask run once per row
+        rather than once per sample.
+        """
+        h = x.unsqueeze(0)
+        mask_iter = iter(masks)
+        for module in self.feature_extractor:
+            h = h * next(mask_iter) if isinstance(module, nn.Dropout) else module(h)
+        return self.output_layer(h).squeeze(-1)
+
 
 # ============================================================
 # Training utilities
@@ -228,6 +259,9 @@ class TrainingConfig:
     weight_decay: float = 1e-4
     device: str = "cuda" if torch.cuda.is_available() else "cpu"
     print_every: int = 5
+    profile_epochs: int = 0             # profile the first N epochs (0 = off)
+    profile_dir: str = "profiles"
+    profile_backend: str = "torch"      # "torch" (Chrome trace) or "cprofile"
 
 
 def train_one_epoch(
@@ -313,9 +347,18 @@ def train_model(
         "val_acc": [],
     }
 
+    ring = ProfileRing(config.profile_dir) if config.profile_epochs > 0 else None
+
     for epoch in range(1, config.n_epochs + 1):
-        train_loss = train_one_epoch(model, train_loader, optimizer, criterion, device)
-        val_loss, val_acc = evaluate(model, val_loader, criterion, device)
+        if ring is not None and epoch <= config.profile_epochs:
+            with capture(ring, f"fit_epoch{epoch:03d}", config.profile_backend) as path:
+                train_loss = train_one_epoch(model, train_loader, optimizer, criterion, device)
+                val_loss, val_acc = evaluate(model, val_loader, criterion, device)
+            if path:
+                print(f"[train_model] Epoch {epoch} profile written to {path}")
+        else:
+            train_loss = train_one_epoch(model, train_loader, optimizer, criterion, device)
+            val_loss, val_acc = evaluate(model, val_loader, criterion, device)
 
         history["train_loss"].append(train_loss)
         history["val_loss"].append(val_loss)
@@ -336,43 +379,147 @@ def train_model(
 # Monte Carlo Dropout prediction
 # ============================================================
 
+def mc_seed(seed_key: str, x: np.ndarray) -> int:
+    """
+    Deterministic 63-bit seed from a key (normally the model version) and
+    the float32 bytes of a transformed feature vector or matrix.
+    """
+    digest = hashlib.blake2b(seed_key.encode(), digest_size=8)
+    digest.update(np.ascontiguousarray(x, dtype=np.float32).tobytes())
+    return int.from_bytes(digest.digest(), "little") & ((1 << 63) - 1)
+
+
+def seeded_generator(seed: int, device: str = "cpu") -> torch.Generator:
+    generator = torch.Generator(device=device)
+    generator.manual_seed(seed)
+    return generator
+
+
+def per_row_dropout_masks(
+    model: BayesianDropoutMLP,
+    X: np.ndarray,
+    n_samples: int,
+    seed_key: str,
+    device: str = "cpu",
+) -> List[torch.Tensor]:
+    """
+    Dropout masks of shape (n_samples, n_rows, width) where row i's masks
+    come from its own generator seeded by mc_seed(seed_key, X[i]), so a row
+    gets the same samples whether it is scored alone or inside any batch.
+    """
+    per_row = [
+        model.sample_dropout_masks(
+            n_samples, generator=seeded_generator(mc_seed(seed_key, x), device), device=device
+        )
+        for x in X
+    ]
+    return [torch.cat(layer_masks, dim=1) for layer_masks in zip(*per_row)]
+
+
 def mc_predict_proba(
     model: nn.Module,
     x: np.ndarray,
     n_samples: int = 1000,
     device: str = "cuda" if torch.cuda.is_available() else "cpu",
+    seed_key: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Monte Carlo dropout prediction for a single example.
     """
-    model.to(device)
-
     if x.ndim == 1:
         x = x.reshape(1, -1)
 
-    x_tensor = torch.tensor(x, dtype=torch.float32).to(device)
+    batch = mc_predict_proba_batch(
+        model, x[:1], n_samples=n_samples, device=device, seed_key=seed_key
+    )
 
+    return {
+        "probs": batch["probs"][0],
+        "mean": float(batch["mean"][0]),
+        "std": float(batch["std"][0]),
+        "ci_5": float(batch["ci_5"][0]),
+        "ci_95": float(batch["ci_95"][0]),
+    }
+
+
+def mc_predict_proba_batch(
+    model: nn.Module,
+    X: np.ndarray,
+    n_samples: int = 1000,
+    device: str = "cuda" if torch.cuda.is_available() else "cpu",
+    max_forward_rows: int = 262_144,
+    keep_samples: bool = True,
+    share_masks: bool = False,
+    seed_key: Optional[str] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Monte Carlo dropout prediction for many examples at once.
+
+    Each example is repeated n_samples times and pushed through the model in
+    a single forward pass per chunk; chunks hold at most `max_forward_rows`
+    (examples x samples) rows so memory stays bounded for large batches.
+    Returns per-example arrays; `probs` (shape (n_examples, n_samples)) is
+    only included when keep_samples is True.
+
+    With share_masks=True every example sees the same n_samples dropout masks
+    (common random numbers): differences between examples then reflect the
+    inputs rather than MC noise, and mask sampling no longer scales with the
+    batch size. Used for grids of closely related what-if scenarios.
+
+    With a `seed_key` the result is a pure function of (seed_key, inputs):
+    dropout masks come from private torch.Generators seeded via mc_seed()
+    (per row, or from the whole batch when sharing masks) and global RNG
+    state is never touched, so concurrent requests cannot perturb each
+    other and a row scores identically alone or in a batch.
+    """
+    model.to(device)
     model.train()  # keep dropout active
-    probs_list = []
 
-    with torch.no_grad():
-        for _ in range(n_samples):
-            logits = model(x_tensor)
-            prob = torch.sigmoid(logits).cpu().numpy().flatten()[0]
-            probs_list.append(prob)
+    n_rows = X.shape[0]
+    chunk = max(max_forward_rows // max(n_samples, 1), 1)
+    result: Dict[str, np.ndarray] = {
+        key: np.empty(n_rows, dtype=np.float64) for key in ("mean", "std", "ci_5", "ci_95")
+    }
+    if keep_samples:
+        result["probs"] = np.empty((n_rows, n_samples), dtype=np.float32)
 
-    probs = np.array(probs_list)
-    mean = float(probs.mean())
-    std = float(probs.std())
-    ci_5 = float(np.percentile(probs, 5))
-    ci_95 = float(np.percentile(probs, 95))
+    shared_masks = None
+    if share_masks:
+        generator = seeded_generator(mc_seed(seed_key, X), device) if seed_key is not None else None
+        shared_masks = model.sample_dropout_masks(n_samples, generator=generator, device=device)
 
+    with torch.no_grad():
+        for start in range(0, n_rows, chunk):
+            x_tensor = torch.tensor(X[start:start + chunk], dtype=torch.float32, device=device)
+            b = x_tensor.shape[0]
+            if shared_masks is not None:
+                logits = model.forward_with_masks(x_tensor, shared_masks)
+            elif seed_key is not None:
+                masks = per_row_dropout_masks(model, X[start:start + chunk], n_samples, seed_key, device)
+                logits = model.forward_with_masks(x_tensor, masks)
+            else:
+                x_rep = x_tensor.unsqueeze(0).expand(n_samples, b, -1).reshape(n_samples * b, -1)
+                logits = model(x_rep)
+            probs = torch.sigmoid(logits).view(n_samples, b).T.cpu().numpy()
+
+            for key, values in summarize_mc_samples(probs).items():
+                if key in result:
+                    result[key][start:start + b] = values
+
+    return result
+
+
+def summarize_mc_samples(probs: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Mean / std / 90% interval over the last axis of an (n_examples, n_samples) array.
+    """
+    ci_5, ci_95 = np.percentile(probs, [5, 95], axis=1)
     return {
         "probs": probs,
-        "mean": mean,
-        "std": std,
-        "ci_5": ci_5,
-        "ci_95": ci_95,
+        "mean": probs.mean(axis=1, dtype=np.float64),
+        "std": probs.std(axis=1, dtype=np.float64),
+        "ci_5": ci_5.astype(np.float64),
+        "ci_95": ci_95.astype(np.float64),
     }
 
 
@@ -400,6 +547,12 @@ class RiskEngineConfig:
     val_size: float = 0.2
     training: TrainingConfig = field(default_factory=TrainingConfig)
     n_mc_samples: int = 1000
+    deterministic_mc: bool = True      # seed MC dropout from (model_version, inputs)
+    grid_mc_samples: int = 128         # scenario_grid default; shared masks already remove speckle
+    grid_sample_budget: int = 512_000  # cap on grid cells x MC samples per scenario_grid call
+    grid_min_samples: int = 16
+    drift_reference_rows: int = 1000   # training rows sketched for drift monitoring (0 = off)
+    drift_bins: int = 20
 
 
 class RiskEngine:
@@ -418,6 +571,8 @@ class RiskEngine:
             label_col=LABEL_COL,
         )
         self.model: Optional[BayesianDropoutMLP] = None
+        self.model_version: Optional[str] = None
+        self.reference_profile: Optional[Dict[str, Any]] = None
 
     # -----------------------------
     # Training
@@ -466,9 +621,69 @@ class RiskEngine:
             config=self.config.training,
         )
 
-        print("=== [RiskEngine.fit] Training complete ===")
+        self.model_version = self.compute_model_version()
+        if self.config.drift_reference_rows > 0:
+            self.reference_profile = self.build_reference_profile(df, X)
+        print(f"=== [RiskEngine.fit] Training complete (model_version={self.model_version}) ===")
         return history
 
+    def build_reference_profile(self, df: pd.DataFrame, X: np.ndarray) -> Dict[str, Any]:
+        """
+        Sketch raw NUMERIC_FEATURES and predictions on a sample of the
+        training data; DriftMonitor compares live traffic against this.
+        """
+        n = min(self.config.drift_reference_rows, len(df))
+        idx = np.random.default_rng(0).choice(len(df), size=n, replace=False)
+        mc_result = self.predict_batch(X[idx], keep_samples=False)
+        return build_reference_profile(
+            NUMERIC_FEATURES,
+            df[NUMERIC_FEATURES].to_numpy(dtype=np.float64)[idx],
+            mc_result["mean"],
+            mc_result["std"],
+            n_bins=self.config.drift_bins,
+        )
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, path: str) -> None:
+        """
+        Write the trained engine (config, fitted preprocessor, weights and
+        drift reference sketches) to a single torch artifact.
+        """
+        self._check_model_ready()
+        torch.save(
+            {
+                "config": self.config,
+                "preprocessor": self.preprocessor,
+                "state_dict": self.model.state_dict(),
+                "input_dim": self.model.input_dim,
+                "model_version": self.model_version,
+                "reference_profile": self.reference_profile,
+            },
+            path,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RiskEngine":
+        """
+        Inverse of save(). The artifact pickles the sklearn preprocessor, so
+        only load files you trust.
+        """
+        artifact = torch.load(path, map_location="cpu", weights_only=False)
+        engine = cls(artifact["config"])
+        engine.preprocessor = artifact["preprocessor"]
+        engine.model = BayesianDropoutMLP(
+            input_dim=artifact["input_dim"],
+            hidden_dims=list(engine.config.hidden_dims),
+            dropout_p=engine.config.dropout_p,
+        )
+        engine.model.load_state_dict(artifact["state_dict"])
+        engine.model.to(engine.config.training.device)
+        engine.model_version = artifact.get("model_version") or engine.compute_model_version()
+        engine.reference_profile = artifact.get("reference_profile")
+        return engine
+
     # -----------------------------
     # Prediction helpers
     # -----------------------------
@@ -476,6 +691,32 @@ class RiskEngine:
         if self.model is None:
             raise RuntimeError("RiskEngine model is not trained yet. Call fit() first.")
 
+    def compute_model_version(self) -> str:
+        """
+        Short content hash of the trained weights and scaler statistics.
+
+        Identical engines get identical versions, so it can key caches and
+        stored predictions without a separate version registry.
+        """
+        self._check_model_ready()
+        digest = hashlib.sha256()
+        for name, tensor in sorted(self.model.state_dict().items()):
+            digest.update(name.encode())
+            digest.update(tensor.detach().cpu().numpy().tobytes())
+        mean, scale = self.preprocessor.numeric_scaler_params()
+        digest.update(mean.tobytes())
+        digest.update(scale.tobytes())
+        return digest.hexdigest()[:16]
+
+    @property
+    def mc_seed_key(self) -> Optional[str]:
+        """
+        Key that makes MC predictions reproducible, or None for fresh randomness.
+        """
+        if not self.config.deterministic_mc:
+            return None
+        return self.model_version or self.compute_model_version()
+
     def predict_row(self, row: pd.Series) -> Dict[str, Any]:
         """
         Run the full MC dropout prediction for a single row (pd.Series).
@@ -493,6 +734,7 @@ class RiskEngine:
             x=X_row[0],
             n_samples=self.config.n_mc_samples,
             device=self.config.training.device,
+            seed_key=self.mc_seed_key,
         )
 
         risk_category = categorize_risk(mc_result["mean"])
@@ -506,6 +748,27 @@ class RiskEngine:
             "all_samples": mc_result["probs"],
         }
 
+    def predict_batch(
+        self,
+        X: np.ndarray,
+        n_samples: Optional[int] = None,
+        keep_samples: bool = True,
+        share_masks: bool = False,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Batched MC dropout prediction for an already-transformed feature matrix.
+        """
+        self._check_model_ready()
+        return mc_predict_proba_batch(
+            model=self.model,
+            X=X,
+            n_samples=n_samples or self.config.n_mc_samples,
+            device=self.config.training.device,
+            keep_samples=keep_samples,
+            share_masks=share_masks,
+            seed_key=self.mc_seed_key,
+        )
+
     def predict_dataframe(self, df_new: pd.DataFrame) -> pd.DataFrame:
         """
         Run MC predictions for every row in a new DataFrame.
@@ -517,29 +780,219 @@ class RiskEngine:
             df_work[LABEL_COL] = 0
 
         X_all, _ = self.preprocessor.transform(df_work)
+        mc_result = self.predict_batch(X_all, keep_samples=False)
+
+        preds_df = pd.DataFrame(
+            {
+                "pred_mean_prob": mc_result["mean"],
+                "pred_std": mc_result["std"],
+                "pred_ci_5": mc_result["ci_5"],
+                "pred_ci_95": mc_result["ci_95"],
+                "pred_risk_category": [categorize_risk(m) for m in mc_result["mean"]],
+            }
+        )
+        return pd.concat(
+            [df_new.reset_index(drop=True), preds_df.reset_index(drop=True)], axis=1
+        )
 
-        records = []
-        for i in range(len(df_work)):
-            mc_result = mc_predict_proba(
-                model=self.model,
-                x=X_all[i],
-                n_samples=self.config.n_mc_samples,
-                device=self.config.training.device,
+    # -----------------------------
+    # What-if analysis
+    # -----------------------------
+    def transform_features(self, rows: pd.DataFrame) -> np.ndarray:
+        """
+        Preprocess unlabeled NUMERIC_FEATURES rows into the model's input matrix.
+        """
+        df_work = rows.copy()
+        df_work[LABEL_COL] = 0
+        X, _ = self.preprocessor.transform(df_work)
+        return X
+
+    def mean_risk_gradient(self, row: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        MC samples for one row plus d(mean risk)/d(input) for every numeric
+        feature, taken with respect to the unscaled values.
+
+        The DERIVED_FEATURES ratios and the StandardScaler are replayed in
+        torch, so a single backward pass through the MC-averaged prediction
+        yields all gradients. An input's gradient includes its effect through
+        the derived features computed from it (e.g. total_story_points also
+        moves average_story_points), matching the recomputed curves from
+        sensitivity(); a derived feature's own gradient holds its inputs fixed.
+        """
+        self._check_model_ready()
+        if self.preprocessor.categorical_features:
+            raise RuntimeError("mean_risk_gradient() only supports numeric-only feature sets.")
+
+        device = self.config.training.device
+        mean, scale = self.preprocessor.numeric_scaler_params()
+        mean_t = torch.tensor(mean, device=device)
+        scale_t = torch.tensor(scale, device=device)
+
+        raw = torch.tensor(
+            row[NUMERIC_FEATURES].to_numpy(dtype=np.float32), device=device, requires_grad=True
+        )
+        # Each derived column keeps its value but also carries the gradient of
+        # its ratio back to the numerator/denominator inputs.
+        index = {name: i for i, name in enumerate(NUMERIC_FEATURES)}
+        columns = list(raw.unbind())
+        for spec in DERIVED_FEATURES:
+            if spec.denominator is None or spec.numerator not in index or spec.denominator not in index:
+                continue
+            ratio = raw[index[spec.numerator]] / raw[index[spec.denominator]].clamp(min=1.0) * spec.scale
+            j = index[spec.name]
+            columns[j] = columns[j] + (ratio - ratio.detach())
+        scaled = (torch.stack(columns) - mean_t) / scale_t
+
+        self.model.to(device)
+        self.model.train()  # keep dropout active
+        n_samples = self.config.n_mc_samples
+        seed_key = self.mc_seed_key
+        if seed_key is not None:
+            # Same masks predict_row() would use for this row
+            x = self.transform_features(row[NUMERIC_FEATURES].to_frame().T)
+            masks = per_row_dropout_masks(self.model, x, n_samples, seed_key, device)
+            probs = torch.sigmoid(self.model.forward_with_masks(scaled.unsqueeze(0), masks)).view(-1)
+        else:
+            probs = torch.sigmoid(self.model(scaled.unsqueeze(0).expand(n_samples, -1))).view(-1)
+        (grad,) = torch.autograd.grad(probs.mean(), raw)
+
+        return probs.detach().cpu().numpy(), grad.cpu().numpy()
+
+    def sensitivity(
+        self,
+        base_project: Dict[str, Any],
+        features: Dict[str, List[float]],
+    ) -> Dict[str, Any]:
+        """
+        What-if curves for slider-style exploration of one project.
+
+        `base_project` is a raw project dict (as posted to /api/endpoint) and
+        `features` maps an input name to the values to try. Every perturbation
+        is scored in one batched MC call; derived features are recomputed for
+        each perturbed row, and all points share the same dropout masks so the
+        curves are smooth. Also returns the gradient of the base project's
+        mean risk with respect to each NUMERIC_FEATURES input, including its
+        effect through the derived ratio features.
+        """
+        self._check_model_ready()
+        empty = [name for name, values in features.items() if len(values) == 0]
+        if empty:
+            raise ValueError(f"sensitivity() features need at least one value: {', '.join(empty)}")
+
+        base_row = derive_features([base_project], strict=True).iloc[0]
+        base_probs, grad = self.mean_risk_gradient(base_row)
+        base_mc = summarize_mc_samples(base_probs[None, :])
+
+        blocks = [
+            apply_overrides(
+                [base_project] * len(values),
+                {name: np.asarray(values, dtype=np.float64)},
             )
-            records.append(
-                {
-                    "pred_mean_prob": mc_result["mean"],
-                    "pred_std": mc_result["std"],
-                    "pred_ci_5": mc_result["ci_5"],
-                    "pred_ci_95": mc_result["ci_95"],
-                    "pred_risk_category": categorize_risk(mc_result["mean"]),
-                }
+            for name, values in features.items()
+        ]
+        curves: Dict[str, Dict[str, List[float]]] = {}
+        if blocks:
+            rows = derive_features(pd.concat(blocks, ignore_index=True), strict=True)
+            mc_result = self.predict_batch(
+                self.transform_features(rows), keep_samples=False, share_masks=True
             )
 
-        preds_df = pd.DataFrame.from_records(records, index=df_work.index)
-        return pd.concat(
-            [df_new.reset_index(drop=True), preds_df.reset_index(drop=True)], axis=1
+            start = 0
+            for name, values in features.items():
+                stop = start + len(values)
+                curves[name] = {
+                    "values": [float(v) for v in values],
+                    "mean_prob": mc_result["mean"][start:stop].tolist(),
+                    "std": mc_result["std"][start:stop].tolist(),
+                    "ci_5": mc_result["ci_5"][start:stop].tolist(),
+                    "ci_95": mc_result["ci_95"][start:stop].tolist(),
+                }
+                start = stop
+
+        base_mean = float(base_mc["mean"][0])
+        return {
+            "base": {
+                "mean_prob": base_mean,
+                "std": float(base_mc["std"][0]),
+                "ci_5": float(base_mc["ci_5"][0]),
+                "ci_95": float(base_mc["ci_95"][0]),
+                "risk_category": categorize_risk(base_mean),
+            },
+            "curves": curves,
+            "gradients": {name: float(g) for name, g in zip(NUMERIC_FEATURES, grad)},
+        }
+
+    def scenario_grid(
+        self,
+        base_project: Dict[str, Any],
+        axes: Dict[str, List[float]],
+        n_samples: Optional[int] = None,
+        chunk_cells: int = 4096,
+    ) -> Dict[str, Any]:
+        """
+        Score the full Cartesian grid of `axes` around one project.
+
+        `axes` maps 1-3 input names to their values (in order); the result
+        holds float32 `mean` / `std` arrays shaped like the grid (C order,
+        first axis slowest). Cells are derived, transformed and MC-scored in
+        chunks of `chunk_cells`, so memory does not grow with grid size.
+        All cells share the same dropout masks so neighbouring cells differ
+        only through their inputs, which keeps heatmaps free of MC speckle.
+
+        `n_samples` defaults to config.grid_mc_samples and is lowered (not
+        below grid_min_samples) so cells x samples stays within
+        grid_sample_budget; the count actually used is returned.
+        """
+        self._check_model_ready()
+        if not 1 <= len(axes) <= 3:
+            raise ValueError("scenario_grid() takes between 1 and 3 axes")
+        empty = [name for name, v in axes.items() if len(v) == 0]
+        if empty:
+            raise ValueError(f"scenario_grid() axes need at least one value: {', '.join(empty)}")
+
+        names = list(axes)
+        values = [np.asarray(axes[name], dtype=np.float64) for name in names]
+        shape = tuple(len(v) for v in values)
+        mesh = [m.ravel() for m in np.meshgrid(*values, indexing="ij")]
+        n_cells = int(np.prod(shape))
+
+        mean = np.empty(n_cells, dtype=np.float32)
+        std = np.empty(n_cells, dtype=np.float32)
+        n_samples = min(
+            n_samples or self.config.grid_mc_samples,
+            max(self.config.grid_sample_budget // n_cells, self.config.grid_min_samples),
         )
+        device = self.config.training.device
+        seed_key = self.mc_seed_key
+        masks = None
+        self.model.to(device)
+
+        for start in range(0, n_cells, chunk_cells):
+            stop = min(start + chunk_cells, n_cells)
+            overrides = {name: m[start:stop] for name, m in zip(names, mesh)}
+            rows = derive_features(
+                apply_overrides([base_project] * (stop - start), overrides), strict=True
+            )
+            X = self.transform_features(rows)
+            if masks is None:
+                # The first cell plus the axis values pin down the whole grid
+                generator = None
+                if seed_key is not None:
+                    generator = seeded_generator(mc_seed(seed_key, np.concatenate([X[0], *values])), device)
+                masks = self.model.sample_dropout_masks(n_samples, generator=generator, device=device)
+            x = torch.tensor(X, dtype=torch.float32, device=device)
+            with torch.no_grad():
+                probs = torch.sigmoid(self.model.forward_with_masks(x, masks))
+            mean[start:stop] = probs.mean(dim=0).cpu().numpy()
+            std[start:stop] = probs.std(dim=0, unbiased=False).cpu().numpy()
+
+        return {
+            "axes": [{"name": name, "values": v.tolist()} for name, v in zip(names, values)],
+            "shape": list(shape),
+            "n_samples": n_samples,
+            "mean": mean.reshape(shape),
+            "std": std.reshape(shape),
+        }
 
 
 # ============================================================
@@ -0,0 +1,275 @@
+# shadow.py
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from risk_engine_core import NUMERIC_FEATURES, RiskEngine, categorize_risk
+
+
+@dataclass
+class ShadowConfig:
+    queue_size: int = 1024          # mirrored requests waiting to be scored; extras are dropped
+    batch_size: int = 64
+    max_wait_s: float = 0.5         # flush a partial batch after this long
+    n_samples: Optional[int] = None  # MC samples per candidate; set to the primary engine's n_mc_samples
+    max_pause_s: float = 2.0        # longest the worker yields to in-flight primary requests per batch
+
+
+# ============================================================
+# Divergence statistics
+# ============================================================
+
+@dataclass
+class DivergenceStats:
+    """
+    Running comparison of one candidate against the primary engine.
+    """
+    n: int = 0
+    sum_delta: float = 0.0          # candidate mean_prob - primary mean_prob
+    sum_abs_delta: float = 0.0
+    sum_sq_delta: float = 0.0
+    max_abs_delta: float = 0.0
+    category_flips: int = 0
+    flip_counts: Dict[str, int] = field(default_factory=dict)   # "Low->Medium" -> count
+    sum_ci_overlap: float = 0.0     # |intersection| / |union| of the 90% intervals
+    disjoint_ci: int = 0
+    mean_in_primary_ci: int = 0
+    scoring_s: float = 0.0
+
+    def update(self, primary: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray]) -> None:
+        delta = candidate["mean"] - primary["mean"]
+        self.n += len(delta)
+        self.sum_delta += float(delta.sum())
+        self.sum_abs_delta += float(np.abs(delta).sum())
+        self.sum_sq_delta += float((delta ** 2).sum())
+        self.max_abs_delta = max(self.max_abs_delta, float(np.abs(delta).max()))
+
+        for p, c in zip(primary["mean"], candidate["mean"]):
+            p_cat, c_cat = categorize_risk(float(p)), categorize_risk(float(c))
+            if p_cat != c_cat:
+                self.category_flips += 1
+                key = f"{p_cat}->{c_cat}"
+                self.flip_counts[key] = self.flip_counts.get(key, 0) + 1
+
+        inter = np.minimum(primary["ci_95"], candidate["ci_95"]) - np.maximum(primary["ci_5"], candidate["ci_5"])
+        union = np.maximum(primary["ci_95"], candidate["ci_95"]) - np.minimum(primary["ci_5"], candidate["ci_5"])
+        overlap = np.where(union > 0, np.clip(inter, 0.0, None) / np.maximum(union, 1e-12), 1.0)
+        self.sum_ci_overlap += float(overlap.sum())
+        self.disjoint_ci += int((inter < 0).sum())
+        self.mean_in_primary_ci += int(
+            ((candidate["mean"] >= primary["ci_5"]) & (candidate["mean"] <= primary["ci_95"])).sum()
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        if self.n == 0:
+            return {"n": 0}
+        mean_delta = self.sum_delta / self.n
+        return {
+            "n": self.n,
+            "mean_delta": mean_delta,
+            "mean_abs_delta": self.sum_abs_delta / self.n,
+            "std_delta": float(np.sqrt(max(self.sum_sq_delta / self.n - mean_delta ** 2, 0.0))),
+            "max_abs_delta": self.max_abs_delta,
+            "category_flip_rate": self.category_flips / self.n,
+            "category_flips": dict(self.flip_counts),
+            "mean_ci_overlap": self.sum_ci_overlap / self.n,
+            "disjoint_ci_rate": self.disjoint_ci / self.n,
+            "mean_in_primary_ci_rate": self.mean_in_primary_ci / self.n,
+            "scoring_s": self.scoring_s,
+        }
+
+
+# ============================================================
+# Shadow scorer
+# ============================================================
+
+class ShadowScorer:
+    """
+    Mirrors primary predictions to candidate engines off the request path.
+
+    mirror() is a non-blocking put into a bounded queue: when the worker
+    falls behind, samples are dropped (and counted) rather than queued
+    without limit or slowing the primary response. A single background
+    worker drains the queue in batches and scores each batch with every
+    candidate via one batched MC call.
+
+    Candidates are scored with the primary's MC sample count; at a lower
+    count the statistics would mostly measure sampling noise. The worker
+    shares torch's intra-op threads with /api/endpoint, so before each
+    candidate it waits (up to `max_pause_s`) until no primary request
+    wrapped in primary_request() is in flight.
+    """
+
+    def __init__(self, candidates: Dict[str, RiskEngine], config: Optional[ShadowConfig] = None) -> None:
+        self.config = config or ShadowConfig()
+        self._queue: "queue.Queue[Tuple[np.ndarray, Tuple[float, float, float]]]" = queue.Queue(
+            maxsize=self.config.queue_size
+        )
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._candidates: Dict[str, RiskEngine] = dict(candidates)
+        self._stats: Dict[str, DivergenceStats] = {name: DivergenceStats() for name in candidates}
+        self._thread: Optional[threading.Thread] = None
+        self.mirrored = 0
+        self.dropped = 0
+        self.paused_s = 0.0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def add_candidate(self, name: str, candidate: RiskEngine) -> None:
+        with self._lock:
+            if name in self._candidates:
+                raise ValueError(f"Shadow candidate {name!r} already exists")
+            self._candidates[name] = candidate
+            self._stats[name] = DivergenceStats()
+
+    def mirror(self, features: np.ndarray, primary: Dict[str, Any]) -> bool:
+        """
+        Queue one prepared NUMERIC_FEATURES vector and the primary result.
+        Returns False if the sample was dropped.
+        """
+        item = (features, (primary["mean_prob"], primary["ci_5"], primary["ci_95"]))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.mirrored += 1
+        return True
+
+    @contextmanager
+    def primary_request(self) -> Iterator[None]:
+        """
+        Mark a primary request as in flight; the worker pauses meanwhile.
+        """
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if self._in_flight == 0:
+                    self._idle.notify_all()
+
+    def _wait_for_idle(self) -> None:
+        start = time.monotonic()
+        with self._lock:
+            self._idle.wait_for(lambda: self._in_flight == 0, timeout=self.config.max_pause_s)
+            self.paused_s += time.monotonic() - start
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+            self._thread.start()
+
+    def _next_batch(self) -> List[Tuple[np.ndarray, Tuple[float, float, float]]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.config.max_wait_s
+        while len(batch) < self.config.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self.score_batch(batch)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                print(f"[ShadowScorer] Batch of {len(batch)} failed: {e}")
+
+    def score_batch(self, batch: List[Tuple[np.ndarray, Tuple[float, float, float]]]) -> None:
+        features = pd.DataFrame(np.stack([f for f, _ in batch]), columns=NUMERIC_FEATURES)
+        primary_values = np.asarray([p for _, p in batch], dtype=np.float64)
+        primary = {
+            "mean": primary_values[:, 0],
+            "ci_5": primary_values[:, 1],
+            "ci_95": primary_values[:, 2],
+        }
+
+        with self._lock:
+            candidates = list(self._candidates.items())
+
+        for name, candidate in candidates:
+            self._wait_for_idle()
+            start = time.perf_counter()
+            X = candidate.transform_features(features)
+            result = candidate.predict_batch(X, n_samples=self.config.n_samples, keep_samples=False)
+            with self._lock:
+                stats = self._stats.get(name)
+                if stats is not None:
+                    stats.update(primary, result)
+                    stats.scoring_s += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            candidates = {
+                name: {
+                    "model_version": self._candidates[name].model_version,
+                    **stats.summary(),
+                }
+                for name, stats in self._stats.items()
+            }
+            mirrored, dropped, paused_s = self.mirrored, self.dropped, self.paused_s
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self.config.queue_size,
+            "n_samples": self.config.n_samples,
+            "mirrored": mirrored,
+            "dropped": dropped,
+            "paused_s": paused_s,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "candidates": candidates,
+        }
+
+
+def shadow_scorer_from_env(n_samples: int) -> Optional[ShadowScorer]:
+    """
+    Build a scorer from RISK_SHADOW_MODELS, a comma-separated list of
+    saved engine paths (RiskEngine.save); None when unset. `n_samples` is
+    the primary engine's n_mc_samples.
+    """
+    paths = [p.strip() for p in os.getenv("RISK_SHADOW_MODELS", "").split(",") if p.strip()]
+    if not paths:
+        return None
+
+    candidates = {}
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in candidates:
+            raise ValueError(
+                f"Duplicate shadow candidate name {name!r} in RISK_SHADOW_MODELS; "
+                "candidates are named by file basename, so give each a distinct file name"
+            )
+        print(f"[ShadowScorer] Loading candidate {name} from {path}")
+        candidates[name] = RiskEngine.load(path)
+
+    config = ShadowConfig(
+        queue_size=int(os.getenv("RISK_SHADOW_QUEUE_SIZE", "1024")),
+        batch_size=int(os.getenv("RISK_SHADOW_BATCH_SIZE", "64")),
+        n_samples=n_samples,
+        max_pause_s=float(os.getenv("RISK_SHADOW_MAX_PAUSE_S", "2.0")),
+    )
+    return ShadowScorer(candidates, config)
@@ -0,0 +1,115 @@
+# stub_llm_server.py
+
+"""
+Minimal OpenAI-compatible chat completions server for local testing.
+
+Answers POST /v1/chat/completions (streaming and non-streaming) with a canned
+reply, emitted word by word with a configurable per-token delay so slow-LLM
+behaviour can be reproduced without an API key:
+
+    python stub_llm_server.py --port 8089 --token-delay 0.05
+    OPENAI_BASE_URL=http://localhost:8089/v1 OPENAI_API_KEY=stub python server.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+REPLY = (
+    "Your backlog is heavy on high-priority stories relative to team size. "
+    "Consider splitting the largest epics and moving testing earlier to reduce delay risk."
+)
+
+
+def make_handler(token_delay: float, first_token_delay: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):  # keep test output quiet
+            pass
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            model = request.get("model", "stub")
+            words = REPLY.split(" ")
+            time.sleep(first_token_delay)
+
+            if not request.get("stream"):
+                time.sleep(token_delay * len(words))
+                self._send_json(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": REPLY},
+                        "finish_reason": "stop",
+                    }],
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            try:
+                for i, word in enumerate(words):
+                    chunk = {
+                        "id": "chatcmpl-stub",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": word if i == 0 else " " + word},
+                            "finish_reason": None,
+                        }],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(token_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client went away mid-stream
+            self.close_connection = True
+
+    return StubHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-delay", type=float, default=0.05, help="seconds per streamed token")
+    parser.add_argument("--first-token-delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port), make_handler(args.token_delay, args.first_token_delay)
+    )
+    print(f"[stub_llm_server] Listening on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
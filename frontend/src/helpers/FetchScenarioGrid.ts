@@ -0,0 +1,51 @@
+import type { FeatureRange } from "./FetchSensitivity";
+
+const BACKEND_URL = "http://localhost:5001/";
+
+interface TypedArrayJson {
+  dtype: "float32";
+  shape: number[];
+  data: string; // base64, little-endian, C order
+}
+
+export interface ScenarioGrid {
+  axes: { name: string; values: number[] }[];
+  shape: number[];
+  nSamples: number; // MC samples actually used per cell
+  mean: Float32Array;
+  std: Float32Array;
+}
+
+function decodeFloat32(encoded: TypedArrayJson): Float32Array {
+  const bytes = Uint8Array.from(atob(encoded.data), (c) => c.charCodeAt(0));
+  return new Float32Array(bytes.buffer);
+}
+
+// Risk heatmap over 1-3 feature axes. Cell (i, j) of a 2D grid is at
+// index i * shape[1] + j in the returned mean/std arrays.
+export default async function FetchScenarioGrid(
+  project: Record<string, number>,
+  axes: Record<string, FeatureRange>,
+  nSamples?: number
+): Promise<ScenarioGrid> {
+  const response = await fetch(`${BACKEND_URL}api/scenario-grid`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ project, axes, n_samples: nSamples }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  const data = await response.json();
+  return {
+    axes: data.axes,
+    shape: data.shape,
+    nSamples: data.n_samples,
+    mean: decodeFloat32(data.mean),
+    std: decodeFloat32(data.std),
+  };
+}
@@ -0,0 +1,46 @@
+const BACKEND_URL = "http://localhost:5001/";
+
+export type FeatureRange =
+  | number[]
+  | { min: number; max: number; steps?: number };
+
+export interface SensitivityCurve {
+  values: number[];
+  mean_prob: number[];
+  std: number[];
+  ci_5: number[];
+  ci_95: number[];
+}
+
+export interface SensitivityResponse {
+  base: {
+    mean_prob: number;
+    std: number;
+    ci_5: number;
+    ci_95: number;
+    risk_category: string;
+  };
+  curves: Record<string, SensitivityCurve>;
+  gradients: Record<string, number>;
+}
+
+// Fetch whole slider curves for several features in one request, so dragging
+// a slider can read from the prefetched curve instead of re-predicting.
+export default async function FetchSensitivity(
+  project: Record<string, number>,
+  features: Record<string, FeatureRange>
+): Promise<SensitivityResponse> {
+  const response = await fetch(`${BACKEND_URL}api/sensitivity`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ project, features }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+
+  return response.json();
+}
@@ -86,7 +86,7 @@ export default function Chatbot() {
       const storedRiskAssessment = localStorage.getItem("riskAssessment");
       const storedFormInputs = localStorage.getItem("formInputs");
 
-      const response = await fetch("http://localhost:5001/api/chatbot", {
+      const response = await fetch("http://localhost:5001/api/chatbot/stream", {
         method: "POST",
         headers: {
           "Content-Type": "application/json",
@@ -101,19 +101,60 @@ export default function Chatbot() {
         }),
       });
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
+      // Read Server-Sent Events and grow the assistant message token by token
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let started = false;
 
-      const assistantMessage: Message = {
-        role: "assistant",
-        content: data.response,
-        timestamp: new Date(),
+      const appendDelta = (delta: string) => {
+        if (!started) {
+          started = true;
+          setMessages((prev) => [
+            ...prev,
+            { role: "assistant", content: "", timestamp: new Date() },
+          ]);
+        }
+        setMessages((prev) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + delta }];
+        });
       };
 
-      setMessages((prev) => [...prev, assistantMessage]);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf("\n\n");
+
+          let eventType = "message";
+          let data = "";
+          for (const line of rawEvent.split("\n")) {
+            if (line.startsWith("event:")) eventType = line.slice(6).trim();
+            else if (line.startsWith("data:")) data += line.slice(5).trim();
+          }
+
+          if (eventType === "error") {
+            throw new Error(JSON.parse(data).error);
+          }
+          if (eventType === "message" && data) {
+            appendDelta(JSON.parse(data).delta);
+          }
+        }
+      }
+
+      if (!started) {
+        throw new Error("Empty response from chatbot");
+      }
     } catch (error) {
       console.error("Error sending message:", error);
       const errorMessage: Message = {
@@ -264,7 +305,7 @@ export default function Chatbot() {
                 )}
               </div>
             ))}
-            {isLoading && (
+            {isLoading && messages[messages.length - 1]?.role === "user" && (
               <div className="flex gap-4">
                 <div className="w-8 h-8 rounded-full bg-gradient-to-br from-orange-500 to-red-600 flex items-center justify-center flex-shrink-0">
                   <span className="text-white text-xs font-bold">T</span>